@@ -1,12 +1,32 @@
 """
 Dependency injection for API endpoints
 """
-from fastapi import Header, HTTPException
-from typing import Optional
+from fastapi import Depends, Header, HTTPException
+from typing import Annotated, Optional
+from collections import defaultdict, deque
+import threading
+import time
 import logging
 
+from config import Config
+
 logger = logging.getLogger(__name__)
 
+# Module-level sliding-window store for rate limiting.
+# In production, use Redis or similar so the window is shared across workers.
+_request_counts: dict = defaultdict(deque)
+_request_counts_lock = threading.Lock()
+
+# monotonic is cheaper than time() and immune to wall-clock jumps, which
+# would otherwise spuriously expire or retain window entries
+_monotonic = time.monotonic
+
+# Valid API keys (placeholder set). frozenset gives O(1) membership checks.
+_VALID_KEYS: frozenset = frozenset({"test_key_123", "legal_drafting_key"})
+
+# Shared anonymous-user payload so the anon path allocates nothing per request
+_ANON_USER = {"user_id": "anonymous", "role": "user"}
+
 async def verify_api_key(x_api_key: Optional[str] = Header(None)):
     """
     Verify API key (simple implementation)
@@ -24,8 +44,7 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)):
         # raise HTTPException(status_code=401, detail="API key required")
     
     # Validate API key (placeholder logic)
-    valid_keys = ["test_key_123", "legal_drafting_key"]
-    if x_api_key and x_api_key not in valid_keys:
+    if x_api_key and x_api_key not in _VALID_KEYS:
         raise HTTPException(status_code=403, detail="Invalid API key")
     
     return x_api_key
@@ -39,34 +58,35 @@ async def get_current_user(x_user_id: Optional[str] = Header(None)):
         return {"user_id": x_user_id, "role": "user"}
     
     # Return anonymous user for development
-    return {"user_id": "anonymous", "role": "user"}
+    return _ANON_USER
+
+# Shared dependency aliases. Routes should use these instead of re-wrapping
+# the callables with Depends(...) at each site, so FastAPI's per-request
+# dependency cache sees the same callable and resolves each one only once.
+ApiKeyDep = Annotated[Optional[str], Depends(verify_api_key)]
+UserDep = Annotated[dict, Depends(get_current_user)]
 
 def rate_limit_check(ip_address: str):
     """
-    Simple rate limiting check
+    Simple sliding-window rate limiting check
     """
-    # In production, use Redis or similar for rate limiting
-    # This is a placeholder implementation
-    import time
-    from collections import defaultdict
-    
-    request_counts = defaultdict(list)
-    current_time = time.time()
-    
-    # Remove requests older than 1 minute
-    request_counts[ip_address] = [
-        req_time for req_time in request_counts.get(ip_address, [])
-        if current_time - req_time < 60
-    ]
-    
-    # Check if rate limit exceeded (60 requests per minute)
-    if len(request_counts[ip_address]) >= 60:
-        raise HTTPException(
-            status_code=429,
-            detail="Rate limit exceeded. Please try again later."
-        )
-    
-    # Add current request
-    request_counts[ip_address].append(current_time)
-    
+    current_time = _monotonic()
+
+    with _request_counts_lock:
+        timestamps = _request_counts[ip_address]
+
+        # Drop requests older than 1 minute
+        while timestamps and current_time - timestamps[0] >= 60:
+            timestamps.popleft()
+
+        # Check if rate limit exceeded
+        if len(timestamps) >= Config.RATE_LIMIT_PER_MINUTE:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded. Please try again later."
+            )
+
+        # Add current request
+        timestamps.append(current_time)
+
     return True
\ No newline at end of file
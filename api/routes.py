@@ -1,78 +1,165 @@
 """
 FastAPI routes for legal document drafting
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional
+import asyncio
+import io
+import re
 import uuid
 import logging
 
-from api.schemas import DocumentRequest, DocumentResponse, DocumentTypeInfo
+from api.dependencies import ApiKeyDep
+from api.schemas import DocumentRequest, DocumentTypeInfo
 from llm.model_handler import LLMHandler
 from document_generation.docx_builder import DocxBuilder
 from utils.error_handlers import DocumentGenerationError, ValidationError
-from utils.file_handlers import cleanup_temp_file
-from config import Config
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Initialize handlers
-llm_handler = LLMHandler()
+# Shared LLMHandler, created lazily on first request instead of at import
+# so module import (and app startup) never blocks on model initialization
+_llm_handler: Optional[LLMHandler] = None
+
+async def get_llm_handler() -> LLMHandler:
+    """Dependency returning the shared LLMHandler instance"""
+    global _llm_handler
+    if _llm_handler is None:
+        _llm_handler = LLMHandler()
+    return _llm_handler
+
+# Supported document types are static - build the models (and their
+# serialized form) once at import instead of per request
+_DOCUMENT_TYPES: List[DocumentTypeInfo] = [
+    DocumentTypeInfo(
+        type_id="loan_agreement",
+        name="Loan Agreement",
+        description="Agreement between lender and borrower",
+        required_fields=["lender", "borrower", "amount", "interest_rate", "tenure"]
+    ),
+    DocumentTypeInfo(
+        type_id="rental_agreement",
+        name="Rental Agreement",
+        description="Agreement between landlord and tenant",
+        required_fields=["landlord", "tenant", "property_address", "rent_amount", "security_deposit"]
+    ),
+    DocumentTypeInfo(
+        type_id="service_agreement",
+        name="Service Agreement",
+        description="Agreement for provision of services",
+        required_fields=["service_provider", "client", "services", "payment_terms"]
+    ),
+    DocumentTypeInfo(
+        type_id="nda",
+        name="Non-Disclosure Agreement",
+        description="Confidentiality agreement",
+        required_fields=["disclosing_party", "receiving_party", "confidential_info"]
+    ),
+    DocumentTypeInfo(
+        type_id="employment_contract",
+        name="Employment Contract",
+        description="Contract between employer and employee",
+        required_fields=["employer", "employee", "position", "salary", "start_date"]
+    ),
+    DocumentTypeInfo(
+        type_id="partnership_deed",
+        name="Partnership Deed",
+        description="Agreement between business partners",
+        required_fields=["partners", "business_name", "capital_contribution", "profit_sharing"]
+    ),
+    DocumentTypeInfo(
+        type_id="affidavit",
+        name="Affidavit",
+        description="Sworn written statement",
+        required_fields=["affiant", "statement", "purpose"]
+    )
+]
+
+_DOCUMENT_TYPES_PAYLOAD = [doc_type.model_dump(exclude_none=True) for doc_type in _DOCUMENT_TYPES]
+
+# Keyword indicators for prompt validation, compiled to one alternation so
+# classification is a single linear scan instead of a per-keyword substring search
+_PROMPT_KEYWORDS = {
+    "loan_agreement": frozenset({"loan", "lender", "borrower", "amount"}),
+    "rental_agreement": frozenset({"rent", "landlord", "tenant", "property"}),
+    "service_agreement": frozenset({"service", "provider", "client", "terms"}),
+}
+_KEYWORD_TO_DOC_TYPE = {
+    keyword: doc_type
+    for doc_type, keywords in _PROMPT_KEYWORDS.items()
+    for keyword in keywords
+}
+_KEYWORD_PATTERN = re.compile("|".join(map(re.escape, _KEYWORD_TO_DOC_TYPE)))
+
+# Small stock of pre-warmed DocxBuilder instances so blank-document setup
+# happens on idle loop time, not on the request critical path. Used builders
+# are discarded (their XML tree is dirtied); the refill task tops the pool
+# back up whenever a slot frees.
+_docx_pool: asyncio.Queue = asyncio.Queue(maxsize=8)
+_docx_pool_task: Optional[asyncio.Task] = None
+
+async def _refill_docx_pool():
+    while True:
+        await _docx_pool.put(DocxBuilder())
+
+def _get_docx_builder() -> DocxBuilder:
+    """Take a pre-warmed builder if available, else build one inline"""
+    global _docx_pool_task
+    if _docx_pool_task is None:
+        _docx_pool_task = asyncio.get_running_loop().create_task(_refill_docx_pool())
+    try:
+        return _docx_pool.get_nowait()
+    except asyncio.QueueEmpty:
+        return DocxBuilder()
 
 @router.post(
     "/draft-document",
-    response_model=DocumentResponse,
     summary="Generate a legal document",
     description="Generate a complete legal document based on the provided prompt and parameters"
 )
 async def draft_document(
     request: DocumentRequest,
-    background_tasks: BackgroundTasks
+    api_key: ApiKeyDep,
+    llm_handler: LLMHandler = Depends(get_llm_handler)
 ):
     """
     Main endpoint for document generation
-    
+
     Args:
         request: Document request with prompt and parameters
-        background_tasks: FastAPI background tasks for cleanup
-    
+
     Returns:
-        FileResponse: Generated .docx document
+        StreamingResponse: Generated .docx document
     """
     try:
         logger.info(f"Received document generation request: {request.document_type}")
-        
-        # Generate document content using LLM
-        document_content = await llm_handler.generate_document(
+
+        # IDs and filename don't depend on the LLM output - compute them up front
+        document_id = str(uuid.uuid4())
+        filename = f"legal_document_{uuid.uuid4().hex[:8]}.docx"
+
+        # Kick off the LLM call and prepare the DOCX skeleton while it is in flight
+        content_task = asyncio.create_task(llm_handler.generate_document(
             prompt=request.prompt,
             doc_type=request.document_type,
             variables=request.variables
-        )
-        
-        # Build DOCX document
-        doc_builder = DocxBuilder()
-        
+        ))
+        doc_builder = _get_docx_builder()
+        document_content = await content_task
+
         # Add title
         doc_builder.add_title(document_content.get("title", "Legal Agreement"))
         
         # Add document metadata
         if "metadata" in document_content:
-            doc_builder.add_paragraph(f"Document ID: {document_content['metadata'].get('document_id', str(uuid.uuid4()))}")
+            doc_builder.add_paragraph(f"Document ID: {document_content['metadata'].get('document_id', document_id)}")
             doc_builder.add_paragraph(f"Generated on: {document_content['metadata'].get('generated_date', '')}")
             doc_builder.add_paragraph("")
         
-        # Add sections
-        for section in document_content.get("sections", []):
-            section_type = section.get("type", "clause")
-            if section_type == "heading":
-                doc_builder.add_heading(section["content"], level=section.get("level", 1))
-            elif section_type == "clause":
-                doc_builder.add_clause(section.get("title", ""), section["content"])
-            elif section_type == "paragraph":
-                doc_builder.add_paragraph(section["content"])
-            elif section_type == "list":
-                doc_builder.add_list(section["items"], ordered=section.get("ordered", False))
+        # Add sections in one bulk tree mutation
+        doc_builder.add_sections_bulk(document_content.get("sections", []))
         
         # Add parties and signature blocks
         if "parties" in document_content:
@@ -90,33 +177,20 @@ async def draft_document(
             doc_builder.add_paragraph("")
             doc_builder.add_paragraph(document_content["footer"], italic=True)
         
-        # Save to temporary file
-        filename = f"legal_document_{uuid.uuid4().hex[:8]}.docx"
-        temp_file = doc_builder.save_to_temp(filename)
-        
-        # Schedule cleanup
-        background_tasks.add_task(cleanup_temp_file, temp_file)
-        
-        # Prepare response
-        response_data = DocumentResponse(
-            success=True,
-            message="Document generated successfully",
-            document_id=str(uuid.uuid4()),
-            filename=filename,
-            document_type=request.document_type,
-            sections_count=len(document_content.get("sections", [])),
-            download_url=f"/api/v1/download/{filename}"  # This would need a download endpoint
-        )
-        
-        # Return both JSON response and file
-        return JSONResponse(
-            content=response_data.dict(),
+        # Stream the document straight back - no tempfile, no second
+        # download round-trip, no cleanup task
+        return StreamingResponse(
+            io.BytesIO(doc_builder.to_bytes()),
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             headers={
-                "X-Document-File": filename,
-                "X-Document-ID": response_data.document_id
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                # Skip gzip middleware - .docx is already a compressed zip
+                "Content-Encoding": "identity",
+                "X-Document-ID": document_id,
+                "X-Sections-Count": str(len(document_content.get("sections", [])))
             }
         )
-        
+
     except ValidationError as e:
         logger.warning(f"Validation error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -132,88 +206,19 @@ async def get_document_types():
     """
     Get list of supported document types
     """
-    document_types = [
-        DocumentTypeInfo(
-            type_id="loan_agreement",
-            name="Loan Agreement",
-            description="Agreement between lender and borrower",
-            required_fields=["lender", "borrower", "amount", "interest_rate", "tenure"]
-        ),
-        DocumentTypeInfo(
-            type_id="rental_agreement",
-            name="Rental Agreement",
-            description="Agreement between landlord and tenant",
-            required_fields=["landlord", "tenant", "property_address", "rent_amount", "security_deposit"]
-        ),
-        DocumentTypeInfo(
-            type_id="service_agreement",
-            name="Service Agreement",
-            description="Agreement for provision of services",
-            required_fields=["service_provider", "client", "services", "payment_terms"]
-        ),
-        DocumentTypeInfo(
-            type_id="nda",
-            name="Non-Disclosure Agreement",
-            description="Confidentiality agreement",
-            required_fields=["disclosing_party", "receiving_party", "confidential_info"]
-        ),
-        DocumentTypeInfo(
-            type_id="employment_contract",
-            name="Employment Contract",
-            description="Contract between employer and employee",
-            required_fields=["employer", "employee", "position", "salary", "start_date"]
-        ),
-        DocumentTypeInfo(
-            type_id="partnership_deed",
-            name="Partnership Deed",
-            description="Agreement between business partners",
-            required_fields=["partners", "business_name", "capital_contribution", "profit_sharing"]
-        ),
-        DocumentTypeInfo(
-            type_id="affidavit",
-            name="Affidavit",
-            description="Sworn written statement",
-            required_fields=["affiant", "statement", "purpose"]
-        )
-    ]
-    return document_types
-
-@router.get("/download/{filename}")
-async def download_document(filename: str):
-    """
-    Download a generated document
-    """
-    import os
-    filepath = os.path.join(Config.TEMP_DIR, filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    return FileResponse(
-        path=filepath,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=filename
-    )
+    # Return the pre-serialized payload directly so FastAPI skips
+    # re-validating the static list on every request
+    return ORJSONResponse(content=_DOCUMENT_TYPES_PAYLOAD)
 
 @router.post("/validate-prompt")
 async def validate_prompt(prompt: str):
     """
     Validate if a prompt contains sufficient information for document generation
     """
-    # Basic validation logic
-    required_keywords = {
-        "loan_agreement": ["loan", "lender", "borrower", "amount"],
-        "rental_agreement": ["rent", "landlord", "tenant", "property"],
-        "service_agreement": ["service", "provider", "client", "terms"],
-    }
-    
-    # Check for document type indicators
-    doc_type = None
-    for doc_type_name, keywords in required_keywords.items():
-        if any(keyword in prompt.lower() for keyword in keywords):
-            doc_type = doc_type_name
-            break
-    
+    # Check for document type indicators - first keyword match wins
+    match = _KEYWORD_PATTERN.search(prompt.lower())
+    doc_type = _KEYWORD_TO_DOC_TYPE[match.group(0)] if match else None
+
     if not doc_type:
         return {
             "valid": False,
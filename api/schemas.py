@@ -1,7 +1,7 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, Dict, Any, List
 from enum import Enum
 from datetime import datetime
@@ -19,6 +19,10 @@ class DocumentType(str, Enum):
 
 class DocumentRequest(BaseModel):
     """Request model for document generation"""
+    # str_strip_whitespace lets pydantic-core strip the prompt in Rust
+    # before the min_length check, so no Python-level validator is needed
+    model_config = ConfigDict(str_strip_whitespace=True, extra='ignore')
+
     prompt: str = Field(
         ...,
         description="Natural language description of the document needed",
@@ -48,16 +52,10 @@ class DocumentRequest(BaseModel):
         max_length=10
     )
     
-    @validator('prompt')
-    def validate_prompt_length(cls, v):
-        if len(v.strip()) < 10:
-            raise ValueError('Prompt must be at least 10 characters long')
-        return v.strip()
-    
-    @validator('variables')
+    @field_validator('variables')
     def validate_variables(cls, v):
         # Remove any None values
-        return {k: v for k, v in v.items() if v is not None}
+        return {k: value for k, value in v.items() if value is not None}
 
 class DocumentResponse(BaseModel):
     """Response model for document generation"""
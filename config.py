@@ -24,6 +24,9 @@ class Config:
     
     # RAG Configuration
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    # "torch" (default) or "onnx"; onnx dispatches quantized int8 CPU
+    # kernels when optimum+onnxruntime are installed
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
     VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "data/embeddings/legal_clauses")
     CLAUSE_DATABASE_PATH = "data/legal_clauses"
     
@@ -2,36 +2,75 @@
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from lxml import etree
+import io
 import tempfile
+import zipfile
 import os
 
+# Style IDs used by the bulk section writer (resolved once at import)
+_SECTION_STYLE_IDS = {
+    1: "Heading1",
+    2: "Heading2",
+    3: "Heading3",
+    "list": "ListParagraph",
+}
+
+def _build_base_doc_bytes():
+    """Serialize a blank document with compact margins baked in"""
+    doc = Document()
+    # Set margins and spacing for compact single-page layout
+    for section in doc.sections:
+        section.top_margin = Inches(0.5)
+        section.bottom_margin = Inches(0.5)
+        section.left_margin = Inches(0.75)
+        section.right_margin = Inches(0.75)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+# Parsed once at import; each builder clones this instead of re-parsing the
+# default blank .docx and re-applying margins per request
+_BASE_DOC_BYTES = _build_base_doc_bytes()
+
+def _load_static_parts():
+    """Split the base .docx into the entries that never change per request
+
+    Everything except word/document.xml (rels, content types, styles,
+    settings) is identical for every generated document, so the raw zip
+    entry bytes are captured once and replayed on the fast save path.
+    """
+    with zipfile.ZipFile(io.BytesIO(_BASE_DOC_BYTES)) as zf:
+        return {
+            name: zf.read(name)
+            for name in zf.namelist()
+            if name != "word/document.xml"
+        }
+
+_STATIC_PARTS = _load_static_parts()
+
+# Opt-in fast emit: serialize only document.xml per request and assemble
+# the zip with compresslevel=1, skipping python-docx's full part re-save
+_FAST_EMIT = os.getenv("FAST_EMIT", "0") == "1"
+
 class DocxBuilder:
     def __init__(self):
-        self.doc = Document()
-        # Set compact formatting for single page
-        self._set_compact_formatting()
-        
-    def _set_compact_formatting(self):
-        """Set margins and spacing for compact single-page layout"""
-        sections = self.doc.sections
-        for section in sections:
-            section.top_margin = Inches(0.5)
-            section.bottom_margin = Inches(0.5)
-            section.left_margin = Inches(0.75)
-            section.right_margin = Inches(0.75)
-    
+        self.doc = Document(io.BytesIO(_BASE_DOC_BYTES))
+
     def add_title(self, title):
         heading = self.doc.add_heading(title, level=0)
         heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         # Compact title spacing
         heading.space_after = Pt(6)
-        
+
     def add_heading(self, text, level=1):
         h = self.doc.add_heading(text, level=level)
         # Reduce spacing for compact layout
         h.space_before = Pt(3)
         h.space_after = Pt(3)
-        
+
     def add_paragraph(self, text, bold=False, italic=False):
         p = self.doc.add_paragraph(text)
         # Ultra-compact paragraph spacing
@@ -40,18 +79,109 @@ class DocxBuilder:
             p.runs[0].bold = True
         if italic:
             p.runs[0].italic = True
-            
+
+    @staticmethod
+    def _p_element(text, style_id=None):
+        """Build a raw <w:p> element without the python-docx wrappers"""
+        p = OxmlElement('w:p')
+        if style_id:
+            p_pr = OxmlElement('w:pPr')
+            p_style = OxmlElement('w:pStyle')
+            p_style.set(qn('w:val'), style_id)
+            p_pr.append(p_style)
+            p.append(p_pr)
+        r = OxmlElement('w:r')
+        t = OxmlElement('w:t')
+        t.text = text
+        t.set(qn('xml:space'), 'preserve')
+        r.append(t)
+        p.append(r)
+        return p
+
+    def _append_body_elements(self, elements):
+        """Insert raw elements before the body's trailing <w:sectPr>
+
+        The body must keep sectPr as its last child; a plain extend
+        would land content after it, producing schema-invalid OOXML and
+        ordering the bulk output after anything the non-bulk add_*
+        methods (which insert before sectPr) wrote later.
+        """
+        sect_pr = self.doc.element.body.find(qn('w:sectPr'))
+        if sect_pr is not None:
+            for el in elements:
+                sect_pr.addprevious(el)
+        else:
+            self.doc.element.body.extend(elements)
+
+    def add_sections_bulk(self, sections):
+        """
+        Append document sections as raw lxml elements in a single pass.
+
+        Much cheaper than one add_heading/add_paragraph call per section
+        because it skips the per-call Paragraph wrapper and style lookups.
+        """
+        elements = []
+        for section in sections:
+            section_type = section.get("type", "clause")
+            if section_type == "heading":
+                level = min(max(section.get("level", 1), 1), 3)
+                elements.append(self._p_element(section["content"], _SECTION_STYLE_IDS[level]))
+            elif section_type == "clause":
+                title = section.get("title", "")
+                if title:
+                    elements.append(self._p_element(title, _SECTION_STYLE_IDS[2]))
+                elements.append(self._p_element(section["content"]))
+            elif section_type == "paragraph":
+                elements.append(self._p_element(section["content"]))
+            elif section_type == "list":
+                for item in section.get("items", []):
+                    elements.append(self._p_element(str(item), _SECTION_STYLE_IDS["list"]))
+
+        self._append_body_elements(elements)
+
+    def add_paragraphs_bulk(self, texts):
+        """Append plain paragraphs as raw elements in one body.extend
+
+        Same per-call savings as add_sections_bulk for runs of consecutive
+        unstyled paragraphs.
+        """
+        self._append_body_elements([self._p_element(text) for text in texts])
+
     def add_clause(self, clause_title, clause_body):
         self.add_heading(clause_title, level=2)
         self.add_paragraph(clause_body)
-        
+
     def add_signature_block(self, party_name, role):
         # Ultra-compact signature format
         p = self.doc.add_paragraph(f"____________________    {party_name} ({role})")
         p.space_after = Pt(0)
-        
+
+    def _fast_docx_bytes(self):
+        """Assemble the .docx from static entries plus fresh document.xml"""
+        doc_xml = etree.tostring(
+            self.doc.element, xml_declaration=True, encoding="UTF-8", standalone=True
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for name, data in _STATIC_PARTS.items():
+                zf.writestr(name, data)
+            zf.writestr("word/document.xml", doc_xml)
+        return buffer.getvalue()
+
+    def to_bytes(self):
+        """Serialize the document to bytes without touching disk"""
+        if _FAST_EMIT:
+            return self._fast_docx_bytes()
+        buffer = io.BytesIO()
+        self.doc.save(buffer)
+        return buffer.getvalue()
+
     def save_to_temp(self, filename="legal_document.docx"):
         temp_dir = tempfile.gettempdir()
         filepath = os.path.join(temp_dir, filename)
-        self.doc.save(filepath)
-        return filepath
\ No newline at end of file
+        if _FAST_EMIT:
+            with open(filepath, "wb") as f:
+                f.write(self._fast_docx_bytes())
+        else:
+            self.doc.save(filepath)
+        return filepath
@@ -2,20 +2,55 @@
 Template processor for docx-template based document generation
 """
 from docxtpl import DocxTemplate
+from concurrent.futures import ThreadPoolExecutor
+import copy
 import tempfile
 import os
+import uuid
 import logging
 from typing import Dict, Any
-import json
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Common legal placeholders merged into every rendering context
+_STATIC_PLACEHOLDERS = {
+    "date": "__________________",
+    "signature": "__________________",
+    "place": "__________________",
+    "witness": "__________________",
+}
+
+def _to_json(value):
+    return orjson.dumps(value).decode()
+
+def _identity(value):
+    return value
+
+# Per-type value transforms - a dict keyed on type() is cheaper than a
+# chain of isinstance checks for every key
+_VALUE_TRANSFORMS = {
+    dict: _to_json,
+    list: _to_json,
+    bool: lambda value: "Yes" if value else "No",
+    type(None): lambda value: "",
+}
+
 class TemplateProcessor:
     """Processor for template-based document generation"""
     
     def __init__(self, template_dir: str = "templates"):
         self.template_dir = template_dir
         self.templates = self.load_templates()
+        # Parse each template .docx exactly once; renders clone the parsed
+        # object instead of re-reading the zip+XML from disk. Parsing is
+        # I/O + decompression, so overlap it across a thread pool.
+        if self.templates:
+            with ThreadPoolExecutor(max_workers=min(8, len(self.templates))) as executor:
+                parsed = executor.map(DocxTemplate, self.templates.values())
+            self._template_objs: Dict[str, DocxTemplate] = dict(zip(self.templates, parsed))
+        else:
+            self._template_objs = {}
     
     def load_templates(self) -> Dict[str, str]:
         """Load available templates"""
@@ -25,12 +60,13 @@ class TemplateProcessor:
             logger.warning(f"Template directory not found: {self.template_dir}")
             return templates
         
-        for filename in os.listdir(self.template_dir):
-            if filename.endswith('.docx'):
-                template_name = filename.replace('.docx', '')
-                templates[template_name] = os.path.join(self.template_dir, filename)
-                logger.info(f"Loaded template: {template_name}")
-        
+        # scandir avoids a stat call per entry when only names are needed
+        with os.scandir(self.template_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.docx'):
+                    templates[entry.name[:-len('.docx')]] = entry.path
+
+        logger.info(f"Loaded {len(templates)} templates from {self.template_dir}")
         return templates
     
     def generate_from_template(self, template_name: str, context: Dict[str, Any]) -> str:
@@ -39,19 +75,18 @@ class TemplateProcessor:
             raise ValueError(f"Template '{template_name}' not found")
         
         try:
-            # Load template
-            template_path = self.templates[template_name]
-            doc = DocxTemplate(template_path)
-            
+            # Clone the cached parsed template
+            doc = copy.deepcopy(self._template_objs[template_name])
+
             # Prepare context
             prepared_context = self.prepare_context(context)
-            
+
             # Render template
             doc.render(prepared_context)
-            
+
             # Save to temp file
             temp_dir = tempfile.gettempdir()
-            output_filename = f"{template_name}_{tempfile.mktemp(suffix='.docx')}"
+            output_filename = f"{template_name}_{uuid.uuid4().hex}.docx"
             output_path = os.path.join(temp_dir, output_filename)
             
             doc.save(output_path)
@@ -65,25 +100,15 @@ class TemplateProcessor:
     
     def prepare_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare context for template rendering"""
-        prepared = context.copy()
-        
         # Ensure all values are template-friendly
-        for key, value in context.items():
-            if value is None:
-                prepared[key] = ""
-            elif isinstance(value, dict) or isinstance(value, list):
-                prepared[key] = json.dumps(value, ensure_ascii=False)
-            elif isinstance(value, bool):
-                prepared[key] = "Yes" if value else "No"
-        
+        prepared = {
+            key: _VALUE_TRANSFORMS.get(type(value), _identity)(value)
+            for key, value in context.items()
+        }
+
         # Add common legal placeholders
-        prepared.update({
-            "date": "__________________",
-            "signature": "__________________",
-            "place": "__________________",
-            "witness": "__________________",
-        })
-        
+        prepared.update(_STATIC_PLACEHOLDERS)
+
         return prepared
     
     def create_template(self, template_name: str, document_structure: Dict[str, Any]) -> str:
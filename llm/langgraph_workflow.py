@@ -4,12 +4,62 @@ LangGraph workflow for multi-step document generation
 from typing import Dict, Any, List
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Matches amounts like "₹5,00,000" or "50000"; compiled once, not per request
+_AMOUNT_RE = re.compile(r'₹?(\d+[,\d]*)')
+
+# Words that betray unfinished boilerplate in generated section content
+_PLACEHOLDER_RE = re.compile(r'placeholder|fill|specific', re.IGNORECASE)
+
+# Static outline prompt body; only the dynamic fields are substituted per run
+_OUTLINE_PROMPT = """
+Generate a comprehensive outline for a {doc_type} based on:
+
+User Requirements: {prompt}
+Retrieved Clauses: {clause_count} relevant clauses found
+
+The outline should include:
+1. Title
+2. Preamble/Introduction
+3. Definitions (if needed)
+4. Main clauses and sections
+5. Standard legal clauses (termination, governing law, etc.)
+6. Signature blocks
+
+Return the outline as a structured JSON with section titles and brief descriptions.
+"""
+
+# Cap on review->regenerate round trips; bounds worst-case LLM spend and
+# latency at MAX_REVISIONS extra generations per document
+MAX_REVISIONS = 2
+
+# Default outline skeleton; read-only, shared across runs
+_OUTLINE_SECTIONS = [
+    {"title": "Parties", "description": "Identification of parties"},
+    {"title": "Terms", "description": "Main terms and conditions"},
+    {"title": "Obligations", "description": "Rights and obligations"},
+    {"title": "Termination", "description": "Termination conditions"},
+    {"title": "Governing Law", "description": "Applicable law and jurisdiction"},
+    {"title": "Signatures", "description": "Signature blocks"}
+]
+
 class DocumentGenerationState:
-    """State for document generation workflow"""
+    """State for document generation workflow
+
+    Slotted: one state object lives per in-flight request, so the fixed
+    layout keeps per-request memory down and attribute access cheap.
+    """
+    __slots__ = (
+        "prompt", "document_type", "variables", "retrieved_clauses",
+        "document_structure", "generated_content", "final_document",
+        "review_result", "revision_count"
+    )
+
     def __init__(self):
         self.prompt = ""
         self.document_type = ""
@@ -18,14 +68,18 @@ class DocumentGenerationState:
         self.document_structure = {}
         self.generated_content = ""
         self.final_document = {}
+        self.revision_count = 0
 
 # Define workflow states
 class DocumentGenerationWorkflow:
     """Multi-step document generation workflow using LangGraph"""
     
-    def __init__(self, llm_handler, rag_pipeline):
+    def __init__(self, llm_handler, rag_pipeline, max_inflight: int = 6):
         self.llm_handler = llm_handler
         self.rag_pipeline = rag_pipeline
+        # Bounds concurrent per-section generations so fan-out stays within
+        # provider rate limits
+        self.section_semaphore = asyncio.Semaphore(max_inflight)
         self.workflow = self.create_workflow()
     
     def create_workflow(self):
@@ -42,9 +96,12 @@ class DocumentGenerationWorkflow:
         
         # Define edges
         workflow.set_entry_point("analyze_prompt")
+        # Fan out: clause retrieval and outline generation only depend on
+        # the prompt analysis, so they run in parallel and join before
+        # content generation - RAG I/O overlaps the outline work
         workflow.add_edge("analyze_prompt", "retrieve_clauses")
-        workflow.add_edge("retrieve_clauses", "generate_outline")
-        workflow.add_edge("generate_outline", "generate_content")
+        workflow.add_edge("analyze_prompt", "generate_outline")
+        workflow.add_edge(["retrieve_clauses", "generate_outline"], "generate_content")
         workflow.add_edge("generate_content", "review_document")
         workflow.add_edge("review_document", "finalize_document")
         workflow.add_edge("finalize_document", END)
@@ -72,8 +129,7 @@ class DocumentGenerationWorkflow:
         # In production, use more sophisticated NLP
         if "loan" in state.prompt.lower():
             # Extract loan-specific variables
-            import re
-            amount_match = re.search(r'₹?(\d+[,\d]*)', state.prompt)
+            amount_match = _AMOUNT_RE.search(state.prompt)
             if amount_match:
                 state.variables["amount"] = amount_match.group(1)
         
@@ -99,54 +155,75 @@ class DocumentGenerationWorkflow:
         logger.info("Step 3: Generating document outline")
         
         # Prepare prompt for outline generation
-        outline_prompt = f"""
-        Generate a comprehensive outline for a {state.document_type} based on:
-        
-        User Requirements: {state.prompt}
-        Retrieved Clauses: {len(state.retrieved_clauses)} relevant clauses found
-        
-        The outline should include:
-        1. Title
-        2. Preamble/Introduction
-        3. Definitions (if needed)
-        4. Main clauses and sections
-        5. Standard legal clauses (termination, governing law, etc.)
-        6. Signature blocks
-        
-        Return the outline as a structured JSON with section titles and brief descriptions.
-        """
-        
+        outline_prompt = _OUTLINE_PROMPT.format(
+            doc_type=state.document_type,
+            prompt=state.prompt,
+            clause_count=len(state.retrieved_clauses)
+        )
+
         # Call LLM for outline
         # This is simplified - in production, use actual LLM call
         outline = {
             "title": f"{state.document_type.replace('_', ' ').title()}",
-            "sections": [
-                {"title": "Parties", "description": "Identification of parties"},
-                {"title": "Terms", "description": "Main terms and conditions"},
-                {"title": "Obligations", "description": "Rights and obligations"},
-                {"title": "Termination", "description": "Termination conditions"},
-                {"title": "Governing Law", "description": "Applicable law and jurisdiction"},
-                {"title": "Signatures", "description": "Signature blocks"}
-            ]
+            "sections": _OUTLINE_SECTIONS
         }
         
         state.document_structure = outline
         return {"document_structure": outline}
     
+    def _batch_sections_prompt(self, state: DocumentGenerationState) -> str:
+        """Build one prompt asking for every outlined section in a single reply"""
+        section_lines = "\n".join(
+            f"{i}. {section['title']}: {section.get('description', '')}"
+            for i, section in enumerate(state.document_structure.get("sections", []), 1)
+        )
+        return f"""Draft the full content for a {state.document_type} covering these sections:
+
+{section_lines}
+
+User Requirements: {state.prompt}
+
+Return a JSON object of the form {{"sections": [{{"type": "clause", "title": ..., "content": ...}}]}} with one entry per section above."""
+
+    async def _gen_section(self, section: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate content for a single section
+
+        Sections are independent, so callers fan these out concurrently.
+        In production, this awaits self.llm_handler.call_llm(...) per section.
+        """
+        async with self.section_semaphore:
+            return {
+                "type": "clause",
+                "title": section["title"],
+                "content": f"This section covers {section['description']}. Specific terms to be filled based on user requirements."
+            }
+
     async def generate_content(self, state: DocumentGenerationState) -> Dict[str, Any]:
         """Step 4: Generate detailed content for each section"""
         logger.info("Step 4: Generating document content")
-        
-        # This would use the LLM to generate content for each section
-        # For now, use simplified content
+        state.revision_count += 1
+
+        # Prefer one batched LLM request for the whole outline - a single
+        # round-trip amortizes the system-prompt prefill across all sections
         sections = []
-        for section in state.document_structure.get("sections", []):
-            sections.append({
-                "type": "clause",
-                "title": section["title"],
-                "content": f"This section covers {section['description']}. Specific terms to be filled based on user requirements."
-            })
-        
+        try:
+            response = await self.llm_handler.call_llm(
+                "You are an expert legal drafter. Reply with valid JSON only.",
+                self._batch_sections_prompt(state)
+            )
+            sections = self.llm_handler.parse_llm_response(response).get("sections", [])
+        except Exception as e:
+            logger.warning(f"Batched section generation failed: {str(e)}")
+
+        if not sections:
+            # Fall back to concurrent per-section generation - each is an
+            # independent I/O-bound task, so wall clock is the slowest
+            # section rather than the sum of all of them
+            sections = list(await asyncio.gather(*(
+                self._gen_section(section)
+                for section in state.document_structure.get("sections", [])
+            )))
+
         state.generated_content = {
             "title": state.document_structure["title"],
             "sections": sections
@@ -158,36 +235,43 @@ class DocumentGenerationWorkflow:
         """Step 5: Review and validate the generated document"""
         logger.info("Step 5: Reviewing document")
         
-        # Check if document is complete
+        # Cheap structural gate first: title + non-empty sections
         content = state.generated_content
-        is_complete = (
-            content and
-            "title" in content and
-            "sections" in content and
-            len(content["sections"]) > 0
-        )
-        
-        # Check for placeholders
-        has_placeholders = any(
-            "placeholder" in str(section).lower() or 
-            "fill" in str(section).lower() or
-            "specific" in str(section).lower()
-            for section in content.get("sections", [])
-        )
-        
+        sections = content.get("sections", []) if content else []
+        is_complete = bool(content) and "title" in content and len(sections) > 0
+
+        if not is_complete:
+            # Structurally broken - revision is needed regardless of
+            # wording, so skip the per-section placeholder scan
+            has_placeholders = False
+        else:
+            # Scan just the content strings with one compiled pattern
+            # instead of stringifying each section dict three times
+            has_placeholders = any(
+                _PLACEHOLDER_RE.search(section.get("content", ""))
+                for section in sections
+            )
+
         review_result = {
             "is_complete": is_complete,
             "has_placeholders": has_placeholders,
-            "sections_count": len(content.get("sections", [])),
+            "sections_count": len(sections),
             "needs_revision": has_placeholders or not is_complete
         }
-        
+
+        state.review_result = review_result
         return {"review_result": review_result}
     
     def should_revise(self, state: DocumentGenerationState) -> str:
         """Determine if document needs revision"""
         review_result = getattr(state, "review_result", {})
-        
+
+        # Stop revising once the cap is hit - without this, persistent
+        # placeholder hits would loop the LLM call forever
+        if state.revision_count > MAX_REVISIONS:
+            logger.warning("Revision cap reached; approving document as-is")
+            return "approve"
+
         if review_result.get("needs_revision", True):
             return "revise"
         else:
@@ -216,19 +300,34 @@ class DocumentGenerationWorkflow:
         state.final_document = final_doc
         return {"final_document": final_doc}
     
-    async def run(self, prompt: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Run the complete workflow"""
-        logger.info(f"Starting document generation workflow for prompt: {prompt[:50]}...")
-        
-        # Initialize state
+    async def stream(self, prompt: str, variables: Dict[str, Any] = None):
+        """Stream per-node outputs as the workflow progresses
+
+        Yields one {node_name: output} event per completed node, so
+        consumers can render the title, outline and early sections while
+        later steps are still running instead of waiting for the whole
+        pipeline.
+        """
         state = DocumentGenerationState()
         state.prompt = prompt
         state.variables = variables or {}
-        
-        # Run workflow
+
+        async for event in self.workflow.astream(state, stream_mode="updates"):
+            yield event
+
+    async def run(self, prompt: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Run the complete workflow"""
+        logger.info(f"Starting document generation workflow for prompt: {prompt[:50]}...")
+
+        # Consume the stream and keep only the terminal document - callers
+        # that want progressive output use stream() directly
+        final_document: Dict[str, Any] = {}
         try:
-            result = await self.workflow.ainvoke(state)
-            return result.get("final_document", {})
+            async for event in self.stream(prompt, variables):
+                for output in event.values():
+                    if output and "final_document" in output:
+                        final_document = output["final_document"]
+            return final_document
         except Exception as e:
             logger.error(f"Workflow failed: {str(e)}")
             raise
\ No newline at end of file
@@ -1,10 +1,16 @@
 """
 LLM model handler for document generation
 """
-import json
+import asyncio
+import copy
 import logging
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
 from typing import Dict, Any, Optional
 import google.generativeai as genai
+import orjson
 
 from config import Config
 from llm.prompt_templates import generate_prompt
@@ -12,33 +18,109 @@ from llm.rag_pipeline import RAGPipeline
 
 logger = logging.getLogger(__name__)
 
+# Keyword indicators per document type, compiled once into a single
+# alternation so detection is one linear scan instead of a Python-level
+# substring search per keyword. At equal positions the pattern prefers
+# earlier entries, preserving the old if/elif priority.
+_DOC_TYPE_KEYWORDS = {
+    "loan_agreement": ["loan", "lender", "borrower", "interest rate"],
+    "rental_agreement": ["rent", "landlord", "tenant", "lease", "property"],
+    "service_agreement": ["service", "provider", "client", "deliverables"],
+    "nda": ["nda", "non-disclosure", "confidential", "proprietary"],
+    "employment_contract": ["employment", "employee", "employer", "salary"],
+    "partnership_deed": ["partnership", "partners", "business", "share"],
+    "affidavit": ["affidavit", "sworn", "declare", "oath"],
+}
+_KEYWORD_TO_DOC_TYPE = {
+    keyword: doc_type
+    for doc_type, keywords in _DOC_TYPE_KEYWORDS.items()
+    for keyword in keywords
+}
+_DOC_TYPE_PATTERN = re.compile("|".join(map(re.escape, _KEYWORD_TO_DOC_TYPE)))
+
+# Markdown-style headings (#, ##, ###) in plain-text LLM replies; one
+# multiline scan replaces per-line startswith dispatch
+_HEAD_RE = re.compile(r'^[ \t]*(#{1,3}) +(.*?)[ \t]*$', re.MULTILINE)
+
+# Max prompt/response pairs kept in the per-handler response cache
+_RESPONSE_CACHE_SIZE = 256
+
+# Skeleton returned when the LLM is unavailable; deepcopied per call so the
+# dict literal isn't rebuilt (callers may mutate their copy freely)
+_FALLBACK_TEMPLATE: Dict[str, Any] = {
+    "title": "",
+    "sections": [
+        {
+            "type": "heading",
+            "title": "Agreement",
+            "content": "",
+            "level": 1
+        },
+        {
+            "type": "clause",
+            "title": "Parties",
+            "content": "This agreement is made between the parties as described in the user prompt."
+        },
+        {
+            "type": "clause",
+            "title": "Terms and Conditions",
+            "content": "The terms and conditions shall be as mutually agreed upon by the parties."
+        },
+        {
+            "type": "clause",
+            "title": "Governing Law",
+            "content": "This agreement shall be governed by the applicable laws."
+        }
+    ],
+    "parties": [
+        {"name": "Party A", "role": "First Party"},
+        {"name": "Party B", "role": "Second Party"}
+    ]
+}
+
 class LLMHandler:
     """Handler for LLM interactions"""
     
     def __init__(self):
         self.rag_pipeline = RAGPipeline()
+        # LRU cache of prompt-hash -> response; identical prompts (e.g. the
+        # review/revise loop) skip the network call entirely
+        self._response_cache: OrderedDict = OrderedDict()
+        # In-flight coalescing: concurrent callers with the same prompt
+        # await one shared future instead of issuing duplicate API calls
+        self._inflight: Dict[str, asyncio.Future] = {}
         self.initialize_llm()
     
     def initialize_llm(self):
         """Initialize LLM based on configuration"""
         self.llm_provider = Config.LLM_PROVIDER
         logger.info(f"Initializing LLM with provider: '{self.llm_provider}'")
-        
+
         provider = self.llm_provider.strip().lower()
         logger.info(f"Processed provider: '{provider}'")
-        
-        if provider == "gemini":
-            logger.info("Initializing Gemini provider")
-            self.initialize_gemini()
-        elif provider == "llama":
-            logger.info("Initializing Llama provider")
-            self.initialize_llama()
-        elif provider == "mistral":
-            logger.info("Initializing Mistral provider")
-            self.initialize_mistral()
-        else:
+
+        # Dispatch tables of bound methods - O(1) lookup instead of an
+        # if/elif chain of string comparisons, built once per handler.
+        # The normalized key is kept so call_llm skips strip().lower().
+        init_table = {
+            "gemini": self.initialize_gemini,
+            "llama": self.initialize_llama,
+            "mistral": self.initialize_mistral,
+        }
+        self._call_table = {
+            "gemini": self.call_gemini,
+            "llama": self.call_llama,
+            "mistral": self.call_mistral,
+        }
+
+        initializer = init_table.get(provider)
+        if initializer is None:
             logger.error(f"Unknown provider: '{provider}' (original: '{self.llm_provider}')")
             raise ValueError(f"Unsupported LLM provider: '{self.llm_provider}'")
+
+        self._provider_key = provider
+        logger.info(f"Initializing {provider} provider")
+        initializer()
     
     def initialize_gemini(self):
         """Initialize Gemini client"""
@@ -47,6 +129,10 @@ class LLMHandler:
         
         genai.configure(api_key=Config.GEMINI_API_KEY)
         self.model = Config.GEMINI_MODEL
+        # One client object for the handler's lifetime - its underlying
+        # HTTP transport keeps connections alive between calls instead of
+        # paying the TLS handshake per request
+        self._gemini_model = genai.GenerativeModel(self.model)
         logger.info(f"Initialized Gemini with model: {self.model}")
     
     def initialize_llama(self):
@@ -83,8 +169,10 @@ class LLMHandler:
             if not doc_type:
                 doc_type = self.detect_document_type(prompt)
             
-            # Retrieve relevant clauses using RAG
-            relevant_clauses = self.rag_pipeline.retrieve_relevant_clauses(
+            # Retrieve relevant clauses using RAG. The async variant runs
+            # the blocking vector search in a worker thread, so other
+            # in-flight requests keep making progress during retrieval.
+            relevant_clauses = await self.rag_pipeline.aretrieve_relevant_clauses(
                 query=prompt,
                 document_type=doc_type,
                 jurisdiction=variables.get("jurisdiction", "IN") if variables else "IN"
@@ -123,46 +211,89 @@ class LLMHandler:
             raise
     
     async def call_llm(self, system_prompt: str, user_prompt: str) -> str:
-        """Call the LLM with given prompts"""
+        """Call the LLM with given prompts, with an exact-match response cache"""
+        cache_key = blake2b(f"{system_prompt}\x00{user_prompt}".encode()).hexdigest()
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            logger.info("LLM response cache hit")
+            return cached
+
+        # If an identical request is already in flight, piggyback on it
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            logger.info("Coalescing duplicate in-flight LLM call")
+            return await pending
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        from_fallback = False
         try:
-            provider = self.llm_provider.strip().lower()
-            if provider == "gemini":
-                return await self.call_gemini(system_prompt, user_prompt)
-            elif provider == "llama":
-                return await self.call_llama(system_prompt, user_prompt)
-            elif provider == "mistral":
-                return await self.call_mistral(system_prompt, user_prompt)
-            else:
+            call = self._call_table.get(self._provider_key)
+            if call is None:
                 raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
+            try:
+                response = await call(system_prompt, user_prompt)
+            except Exception as e:
+                # Transient provider failure: serve the fallback skeleton
+                # to this caller and any coalesced waiters, but keep it
+                # out of the response cache so the next request retries
+                # the real API instead of seeing a pinned placeholder
+                logger.error(f"LLM call failed, using fallback: {str(e)}")
+                from_fallback = True
+                response = orjson.dumps(
+                    self.generate_fallback_document(system_prompt, user_prompt)
+                ).decode()
         except Exception as e:
             logger.error(f"LLM call failed: {str(e)}")
+            future.set_exception(e)
+            # Waiters consume the exception; keep it from being logged as
+            # unretrieved if there are none
+            future.exception()
             raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+        future.set_result(response)
+        if not from_fallback:
+            self._response_cache[cache_key] = response
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return response
     
     async def call_gemini(self, system_prompt: str, user_prompt: str) -> str:
         """Call Gemini API"""
         try:
-            model = genai.GenerativeModel(self.model)
-            
+            model = self._gemini_model
+
             # Combine system and user prompts for Gemini
             combined_prompt = f"{system_prompt}\n\nUser Request: {user_prompt}"
             
-            response = model.generate_content(
+            # Await the async client call so the event loop stays free for
+            # other in-flight generations instead of blocking for the full
+            # LLM latency. Streaming lets us accumulate the reply as it is
+            # generated instead of idling until the last token.
+            response = await model.generate_content_async(
                 combined_prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.3,  # Conservative for legal documents
                     max_output_tokens=4000,
-                )
+                ),
+                stream=True
             )
-            
-            content = response.text
+
+            parts = []
+            async for chunk in response:
+                parts.append(chunk.text)
+            content = "".join(parts)
             logger.info(f"Gemini response received: {len(content)} characters")
             return content
             
         except Exception as e:
+            # Propagate so call_llm can apply the fallback without
+            # caching it as a successful response for this prompt
             logger.error(f"Gemini API call failed: {str(e)}")
-            # Fallback to simpler generation
-            fallback_response = self.generate_fallback_document(system_prompt, user_prompt)
-            return json.dumps(fallback_response)
+            raise
     
     async def call_llama(self, system_prompt: str, user_prompt: str) -> str:
         """Call local Llama model"""
@@ -172,7 +303,7 @@ class LLMHandler:
         
         # Simulate response
         fallback_response = self.generate_fallback_document(system_prompt, user_prompt)
-        return json.dumps(fallback_response)
+        return orjson.dumps(fallback_response).decode()
     
     async def call_mistral(self, system_prompt: str, user_prompt: str) -> str:
         """Call Mistral AI API"""
@@ -181,59 +312,30 @@ class LLMHandler:
         
         # Simulate response
         fallback_response = self.generate_fallback_document(system_prompt, user_prompt)
-        return json.dumps(fallback_response)
+        return orjson.dumps(fallback_response).decode()
     
     def generate_fallback_document(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         """Generate a fallback document if LLM fails"""
         logger.warning("Using fallback document generation")
         
-        # Extract key information from prompts
-        document_type = "legal_agreement"
-        if "loan" in user_prompt.lower():
-            document_type = "loan_agreement"
-        elif "rent" in user_prompt.lower():
-            document_type = "rental_agreement"
-        elif "service" in user_prompt.lower():
-            document_type = "service_agreement"
-        elif "nda" in user_prompt.lower() or "non-disclosure" in user_prompt.lower():
-            document_type = "nda"
-        
-        return {
-            "title": f"{document_type.replace('_', ' ').title()}",
-            "sections": [
-                {
-                    "type": "heading",
-                    "title": "Agreement",
-                    "content": f"This is a {document_type.replace('_', ' ')} generated by the Legal Drafting System.",
-                    "level": 1
-                },
-                {
-                    "type": "clause",
-                    "title": "Parties",
-                    "content": "This agreement is made between the parties as described in the user prompt."
-                },
-                {
-                    "type": "clause",
-                    "title": "Terms and Conditions",
-                    "content": "The terms and conditions shall be as mutually agreed upon by the parties."
-                },
-                {
-                    "type": "clause",
-                    "title": "Governing Law",
-                    "content": "This agreement shall be governed by the applicable laws."
-                }
-            ],
-            "parties": [
-                {"name": "Party A", "role": "First Party"},
-                {"name": "Party B", "role": "Second Party"}
-            ]
-        }
+        # Extract key information from prompts via the shared matcher
+        document_type = self.detect_document_type(user_prompt)
+        if document_type == "other":
+            document_type = "legal_agreement"
+
+        readable_type = document_type.replace('_', ' ')
+        document = copy.deepcopy(_FALLBACK_TEMPLATE)
+        document["title"] = readable_type.title()
+        document["sections"][0]["content"] = (
+            f"This is a {readable_type} generated by the Legal Drafting System."
+        )
+        return document
     
     def parse_llm_response(self, response_text: str) -> Dict[str, Any]:
         """Parse LLM response into structured document"""
         try:
             # Try to parse as JSON
-            parsed = json.loads(response_text)
+            parsed = orjson.loads(response_text)
             
             # Validate structure
             if not isinstance(parsed, dict):
@@ -251,7 +353,7 @@ class LLMHandler:
             
             return parsed
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning(f"Failed to parse LLM response as JSON: {str(e)}")
             
             # Try to extract structure from plain text
@@ -259,81 +361,42 @@ class LLMHandler:
     
     def parse_text_response(self, text: str) -> Dict[str, Any]:
         """Parse plain text response into structure"""
-        lines = text.strip().split('\n')
+        # One multiline regex pass finds every heading; section bodies are
+        # the slices between consecutive heading spans
         sections = []
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Detect headings
-            if line.startswith('# '):
-                if current_section:
-                    sections.append(current_section)
-                current_section = {
-                    "type": "heading",
-                    "title": line[2:],
-                    "content": "",
-                    "level": 1
-                }
-            elif line.startswith('## '):
-                if current_section:
-                    sections.append(current_section)
-                current_section = {
-                    "type": "heading",
-                    "title": line[3:],
-                    "content": "",
-                    "level": 2
-                }
-            elif line.startswith('### '):
-                if current_section:
-                    sections.append(current_section)
-                current_section = {
-                    "type": "heading",
-                    "title": line[4:],
-                    "content": "",
-                    "level": 3
-                }
-            elif current_section:
-                if current_section["content"]:
-                    current_section["content"] += "\n" + line
-                else:
-                    current_section["content"] = line
-            else:
-                # Start a new paragraph section
-                current_section = {
-                    "type": "paragraph",
-                    "content": line
-                }
-        
-        if current_section:
-            sections.append(current_section)
-        
+
+        def _body(start: int, end: int) -> str:
+            return "\n".join(
+                line.strip() for line in text[start:end].splitlines() if line.strip()
+            )
+
+        matches = list(_HEAD_RE.finditer(text))
+
+        preamble = _body(0, matches[0].start() if matches else len(text))
+        if preamble:
+            sections.append({"type": "paragraph", "content": preamble})
+
+        for match, following in zip(matches, matches[1:] + [None]):
+            sections.append({
+                "type": "heading",
+                "title": match.group(2),
+                "content": _body(match.end(), following.start() if following else len(text)),
+                "level": len(match.group(1))
+            })
+
         return {
             "title": "Legal Document",
             "sections": sections,
             "parties": []
         }
     
-    def detect_document_type(self, prompt: str) -> str:
-        """Detect document type from prompt text"""
-        prompt_lower = prompt.lower()
-        
-        if any(word in prompt_lower for word in ["loan", "lender", "borrower", "interest rate"]):
-            return "loan_agreement"
-        elif any(word in prompt_lower for word in ["rent", "landlord", "tenant", "lease", "property"]):
-            return "rental_agreement"
-        elif any(word in prompt_lower for word in ["service", "provider", "client", "deliverables"]):
-            return "service_agreement"
-        elif any(word in prompt_lower for word in ["nda", "non-disclosure", "confidential", "proprietary"]):
-            return "nda"
-        elif any(word in prompt_lower for word in ["employment", "employee", "employer", "salary"]):
-            return "employment_contract"
-        elif any(word in prompt_lower for word in ["partnership", "partners", "business", "share"]):
-            return "partnership_deed"
-        elif any(word in prompt_lower for word in ["affidavit", "sworn", "declare", "oath"]):
-            return "affidavit"
-        else:
-            return "other"
\ No newline at end of file
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def detect_document_type(prompt: str) -> str:
+        """Detect document type from prompt text - first keyword match wins
+
+        Memoized: the workflow and generate_document both classify the same
+        prompt, so the second call is a dict probe.
+        """
+        match = _DOC_TYPE_PATTERN.search(prompt.lower())
+        return _KEYWORD_TO_DOC_TYPE[match.group(0)] if match else "other"
\ No newline at end of file
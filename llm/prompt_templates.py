@@ -1,6 +1,8 @@
 """
 Prompt templates for different legal document types
 """
+import string
+from functools import lru_cache
 
 PROMPT_TEMPLATES = {
     "loan_agreement": {
@@ -203,63 +205,106 @@ Return a JSON object with:
     "variables": ["jurisdiction"]
 }
 
+# Prompt used when a template still has unresolved fields; static text
+# lives here instead of being rebuilt inside the error path
+_FALLBACK_PROMPT = """Draft a {doc_type} document based on:
+
+User Request: {user_prompt}
+
+Provided Information:
+{provided_information}
+
+Jurisdiction: {jurisdiction}
+
+Relevant Clauses:
+{relevant_clauses}
+
+Please generate a comprehensive legal document with appropriate sections and clauses."""
+
+# Default values for common missing variables; built once instead of
+# per generate_prompt call
+_DEFAULTS = {
+    "lender_address": "[TO BE FILLED]",
+    "borrower_address": "[TO BE FILLED]",
+    "property_type": "[TO BE SPECIFIED]",
+    "furnishing_status": "[TO BE SPECIFIED]",
+    "landlord_address": "[TO BE FILLED]",
+    "tenant_address": "[TO BE FILLED]",
+    "security_deposit": "[TO BE SPECIFIED]",
+    "lease_term": "[TO BE SPECIFIED]",
+    "start_date": "[TO BE FILLED]",
+    "utilities_responsibility": "[TO BE SPECIFIED]",
+    "maintenance_responsibility": "[TO BE SPECIFIED]",
+    "special_conditions": "[NONE SPECIFIED]",
+    "repayment_frequency": "Monthly",
+    "purpose": "[TO BE SPECIFIED]",
+    "disbursement_date": "[TO BE FILLED]",
+    "additional_terms": "[NONE SPECIFIED]",
+    "relevant_clauses": "No relevant clauses found in database."
+}
+
+def _compile_template(template_text: str):
+    """Compile a .format()-style template into a substitution function
+
+    str.format re-parses the format mini-language on every call; an
+    f-string compiled once at import substitutes fields with plain dict
+    lookups. Returns None when the template uses features the compiler
+    doesn't handle, in which case callers fall back to .format().
+    """
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template_text):
+        if literal:
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is not None:
+            if format_spec or conversion or not field.isidentifier():
+                return None
+            parts.append(f'{{d["{field}"]}}')
+    source = 'lambda d: f"""' + "".join(parts) + '"""'
+    try:
+        return eval(source)  # noqa: S307 - source built from our own templates
+    except SyntaxError:
+        return None
+
+# Precompile every user template at import; renders become one function call
+for _template in (*PROMPT_TEMPLATES.values(), DEFAULT_TEMPLATE):
+    _template["_user_fn"] = _compile_template(_template["user"])
+
+# Flattened (system, user_fn, user_text) tuples so generate_prompt does a
+# single dict probe + unpack per request instead of three key lookups
+_DEFAULT_COMPILED = (DEFAULT_TEMPLATE["system"], DEFAULT_TEMPLATE["_user_fn"], DEFAULT_TEMPLATE["user"])
+_TEMPLATES_COMPILED = {
+    doc_type: (template["system"], template["_user_fn"], template["user"])
+    for doc_type, template in PROMPT_TEMPLATES.items()
+}
+
+@lru_cache(maxsize=None)
 def get_template_for_type(doc_type: str):
     """Get prompt template for document type"""
     return PROMPT_TEMPLATES.get(doc_type, DEFAULT_TEMPLATE)
 
 def generate_prompt(doc_type: str, variables: dict, user_prompt: str = "") -> tuple[str, str]:
     """Generate system and user prompts for LLM"""
-    template = get_template_for_type(doc_type)
-    
-    # Prepare variables with defaults
-    prompt_vars = variables.copy()
-    prompt_vars["user_prompt"] = user_prompt
-    
-    # Add default values for common missing variables
-    defaults = {
-        "lender_address": "[TO BE FILLED]",
-        "borrower_address": "[TO BE FILLED]", 
-        "property_type": "[TO BE SPECIFIED]",
-        "furnishing_status": "[TO BE SPECIFIED]",
-        "landlord_address": "[TO BE FILLED]",
-        "tenant_address": "[TO BE FILLED]",
-        "security_deposit": "[TO BE SPECIFIED]",
-        "lease_term": "[TO BE SPECIFIED]",
-        "start_date": "[TO BE FILLED]",
-        "utilities_responsibility": "[TO BE SPECIFIED]",
-        "maintenance_responsibility": "[TO BE SPECIFIED]",
-        "special_conditions": "[NONE SPECIFIED]",
-        "repayment_frequency": "Monthly",
-        "purpose": "[TO BE SPECIFIED]",
-        "disbursement_date": "[TO BE FILLED]",
-        "additional_terms": "[NONE SPECIFIED]",
-        "relevant_clauses": "No relevant clauses found in database."
-    }
-    
-    # Fill in missing variables with defaults
-    for key, default_value in defaults.items():
-        if key not in prompt_vars:
-            prompt_vars[key] = default_value
-    
-    # Fill in template
-    system_prompt = template["system"]
+    system_prompt, user_fn, user_template = _TEMPLATES_COMPILED.get(doc_type, _DEFAULT_COMPILED)
+
+    # Defaults first, then caller-provided values override - one C-level
+    # dict merge instead of copy + per-key membership checks
+    prompt_vars = {**_DEFAULTS, **variables, "user_prompt": user_prompt}
+
+    # Fill in template via the precompiled substitution function; a
+    # missing key raises KeyError either way, preserving the fallback
     try:
-        user_prompt_filled = template["user"].format(**prompt_vars)
+        if user_fn is not None:
+            user_prompt_filled = user_fn(prompt_vars)
+        else:
+            user_prompt_filled = user_template.format(**prompt_vars)
     except KeyError as e:
         # If still missing variables, use fallback template
-        fallback_template = f"""Draft a {doc_type.replace('_', ' ')} document based on:
-
-User Request: {user_prompt}
-
-Provided Information:
-{chr(10).join([f"- {k}: {v}" for k, v in variables.items()])}
-
-Jurisdiction: {variables.get('jurisdiction', 'IN')}
+        user_prompt_filled = _FALLBACK_PROMPT.format(
+            doc_type=doc_type.replace('_', ' '),
+            user_prompt=user_prompt,
+            provided_information="\n".join(f"- {k}: {v}" for k, v in variables.items()),
+            jurisdiction=variables.get('jurisdiction', 'IN'),
+            relevant_clauses=variables.get('relevant_clauses', 'None found')
+        )
 
-Relevant Clauses:
-{variables.get('relevant_clauses', 'None found')}
-
-Please generate a comprehensive legal document with appropriate sections and clauses."""
-        user_prompt_filled = fallback_template
-    
     return system_prompt, user_prompt_filled
\ No newline at end of file
@@ -1,10 +1,15 @@
 """
 RAG (Retrieval-Augmented Generation) pipeline for legal clauses
 """
-import json
+import asyncio
+import atexit
 import os
-from typing import List, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from typing import List, Dict, Any, Optional
 import logging
+import threading
 
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
@@ -12,11 +17,35 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 import chromadb
 from chromadb.config import Settings
+import orjson
 
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Max query/result pairs kept in the per-pipeline retrieval cache
+_RETRIEVAL_CACHE_SIZE = 1024
+
+# Max query embeddings kept; repeats with a different k reuse the vector
+_QUERY_VEC_CACHE_SIZE = 512
+
+# Corpus size at which the flat FAISS index is swapped for IVF + product
+# quantization; below this there is too little data to train the
+# quantizer and exact search is already fast
+_IVFPQ_MIN_VECTORS = 1024
+
+# Separator between formatted clauses; built once
+_CLAUSE_SEPARATOR = "-" * 50
+
+# Process-wide embedding model - loading the SentenceTransformer costs
+# hundreds of ms and ~90MB, so every RAGPipeline shares one instance
+_EMBEDDINGS_LOCK = threading.Lock()
+_EMBEDDINGS: Optional[HuggingFaceEmbeddings] = None
+
+# Debounce window for write-behind index saves; bursty inserts collapse
+# into one disk write
+_FLUSH_DELAY_SECONDS = 1.0
+
 class RAGPipeline:
     """RAG pipeline for legal document generation"""
     
@@ -26,24 +55,118 @@ class RAGPipeline:
         self.chroma_client = None
         self.collection = None
         self.embeddings = None
-        
-        # Initialize in background or skip if offline
-        try:
-            self.initialize_embeddings()
-            self.initialize_vector_store()
-        except Exception as e:
-            logger.warning(f"Could not initialize embeddings/vector store: {e}")
-            logger.info("Running in offline mode without RAG capabilities")
+        # LRU of query-hash -> retrieved clauses; repeat queries skip the
+        # embedding forward pass, which dominates retrieval cost
+        self._retrieval_cache: OrderedDict = OrderedDict()
+        # LRU of query text -> embedding vector
+        self._query_vec_cache: OrderedDict = OrderedDict()
+        # Embeddings and the vector store load lazily on first retrieval -
+        # constructing a pipeline stays cheap for requests that never
+        # touch RAG, and application startup no longer blocks on Torch
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        # Write-behind state for index saves
+        self._dirty = False
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self._flush_index)
+
+    def _embed_query_cached(self, query: str):
+        """Embed a query string, reusing cached vectors for repeats
+
+        A repeat query with a different k would otherwise pay the full
+        encoder forward pass again just to rank against the same index.
+        """
+        vec = self._query_vec_cache.get(query)
+        if vec is not None:
+            self._query_vec_cache.move_to_end(query)
+            return vec
+
+        vec = self.embeddings.embed_query(query)
+        self._query_vec_cache[query] = vec
+        if len(self._query_vec_cache) > _QUERY_VEC_CACHE_SIZE:
+            self._query_vec_cache.popitem(last=False)
+        return vec
+
+    def _flush_index(self):
+        """Persist the vector store if it has unsaved additions"""
+        if not self._dirty or not self.vector_store:
+            return
+        with self._flush_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self.vector_store.save_local(Config.VECTOR_STORE_PATH)
+            logger.info("Flushed vector store to disk")
+
+    def _schedule_flush(self):
+        """Debounced write-behind save of the vector store
+
+        Each insert marks the store dirty and (re)arms a short timer, so a
+        burst of additions costs one save_local instead of one per clause.
+        The atexit hook covers anything still pending at shutdown.
+        """
+        self._dirty = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(_FLUSH_DELAY_SECONDS, self._flush_index)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _ensure_ready(self):
+        """Load embeddings and the vector store on first use"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+            try:
+                if self.embeddings is None:
+                    self.initialize_embeddings()
+                if self.vector_store is None:
+                    self.initialize_vector_store()
+            except Exception as e:
+                logger.warning(f"Could not initialize embeddings/vector store: {e}")
+                logger.info("Running in offline mode without RAG capabilities")
     
     def initialize_embeddings(self):
         """Initialize embedding model"""
+        global _EMBEDDINGS
         try:
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=Config.EMBEDDING_MODEL,
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': False}
-            )
-            logger.info(f"Initialized embeddings with model: {Config.EMBEDDING_MODEL}")
+            with _EMBEDDINGS_LOCK:
+                if _EMBEDDINGS is None:
+                    model_kwargs = {'device': 'cpu'}
+                    if Config.EMBEDDING_BACKEND != "torch":
+                        # sentence-transformers hands this to ONNX Runtime,
+                        # whose int8 kernels roughly double CPU throughput
+                        model_kwargs['backend'] = Config.EMBEDDING_BACKEND
+                    try:
+                        _EMBEDDINGS = HuggingFaceEmbeddings(
+                            model_name=Config.EMBEDDING_MODEL,
+                            model_kwargs=model_kwargs,
+                            # Large encode batches keep the matmul-bound encoder fed
+                            encode_kwargs={'normalize_embeddings': False, 'batch_size': 64}
+                        )
+                    except Exception as backend_err:
+                        # The backend kwarg needs sentence-transformers >= 3.0;
+                        # on the pinned 2.2.2 it raises at construction. Retry
+                        # on torch so RAG keeps working, rather than letting
+                        # the outer handler drop the pipeline to offline mode
+                        if 'backend' not in model_kwargs:
+                            raise
+                        logger.warning(
+                            f"Embedding backend '{Config.EMBEDDING_BACKEND}' "
+                            f"unavailable ({backend_err}); retrying with torch"
+                        )
+                        del model_kwargs['backend']
+                        _EMBEDDINGS = HuggingFaceEmbeddings(
+                            model_name=Config.EMBEDDING_MODEL,
+                            model_kwargs=model_kwargs,
+                            encode_kwargs={'normalize_embeddings': False, 'batch_size': 64}
+                        )
+                    logger.info(f"Initialized embeddings with model: {Config.EMBEDDING_MODEL}")
+            self.embeddings = _EMBEDDINGS
         except Exception as e:
             logger.warning(f"Failed to initialize HuggingFace embeddings: {str(e)}")
             logger.info("Falling back to dummy embeddings for offline mode")
@@ -62,11 +185,7 @@ class RAGPipeline:
             # Try to load existing vector store
             if os.path.exists(Config.VECTOR_STORE_PATH) and self.embeddings:
                 logger.info(f"Loading existing vector store from {Config.VECTOR_STORE_PATH}")
-                self.vector_store = FAISS.load_local(
-                    Config.VECTOR_STORE_PATH,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
+                self.vector_store = self._load_vector_store()
             else:
                 logger.info("Creating new vector store")
                 self.create_vector_store()
@@ -75,29 +194,78 @@ class RAGPipeline:
             logger.info("Running without vector store")
             self.vector_store = None
     
+    def _load_vector_store(self) -> FAISS:
+        """Load the saved FAISS store with a memory-mapped index
+
+        faiss.read_index with IO_FLAG_MMAP leaves the vector table in the
+        OS page cache instead of copying it into process RAM, so several
+        workers share one resident copy and warm restarts read almost no
+        bytes. Falls back to the regular loader for index types that
+        don't support mmap.
+        """
+        import pickle
+        import faiss
+
+        try:
+            index = faiss.read_index(
+                os.path.join(Config.VECTOR_STORE_PATH, "index.faiss"),
+                faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            with open(os.path.join(Config.VECTOR_STORE_PATH, "index.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+
+            return FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+        except Exception as e:
+            logger.warning(f"mmap index load failed, reading into RAM: {str(e)}")
+            return FAISS.load_local(
+                Config.VECTOR_STORE_PATH,
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+
     def load_legal_clauses(self) -> List[Dict[str, Any]]:
         """Load legal clauses from JSON files"""
         clauses = []
         clause_dir = Config.CLAUSE_DATABASE_PATH
-        
+
         if not os.path.exists(clause_dir):
             logger.warning(f"Clause directory not found: {clause_dir}")
             return self.get_default_clauses()
-        
-        for filename in os.listdir(clause_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(clause_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        file_clauses = json.load(f)
-                        if isinstance(file_clauses, list):
-                            clauses.extend(file_clauses)
-                        else:
-                            clauses.append(file_clauses)
-                    logger.info(f"Loaded clauses from {filename}")
-                except Exception as e:
-                    logger.error(f"Error loading {filename}: {str(e)}")
-        
+
+        # scandir avoids a stat call per entry when only names are needed
+        with os.scandir(clause_dir) as entries:
+            filepaths = [
+                entry.path for entry in entries
+                if entry.is_file() and entry.name.endswith('.json')
+            ]
+
+        if not filepaths:
+            return clauses
+
+        def _load_one(filepath):
+            try:
+                with open(filepath, 'rb') as f:
+                    return filepath, orjson.loads(f.read())
+            except Exception as e:
+                logger.error(f"Error loading {os.path.basename(filepath)}: {str(e)}")
+                return filepath, None
+
+        # Parse with orjson and overlap the file reads across a thread pool
+        with ThreadPoolExecutor(max_workers=min(8, len(filepaths))) as executor:
+            for filepath, file_clauses in executor.map(_load_one, filepaths):
+                if file_clauses is None:
+                    continue
+                if isinstance(file_clauses, list):
+                    clauses.extend(file_clauses)
+                else:
+                    clauses.append(file_clauses)
+                logger.info(f"Loaded clauses from {os.path.basename(filepath)}")
+
         return clauses
     
     def get_default_clauses(self) -> List[Dict[str, Any]]:
@@ -149,8 +317,38 @@ class RAGPipeline:
         
         return default_clauses
     
+    @staticmethod
+    def _build_document(clause: Dict[str, Any]) -> Document:
+        """Build the embeddable Document for a clause record"""
+        # Shared lookups feed both the content string and the metadata;
+        # the unindented f-string needs no trailing .strip() pass
+        document_type = clause.get("document_type", "general")
+        clause_title = clause.get("clause_title", "")
+        jurisdiction = clause.get("jurisdiction", "general")
+        keywords = ", ".join(clause.get("keywords", []))
+
+        content = (
+            f"Document Type: {document_type}\n"
+            f"Clause Title: {clause_title}\n"
+            f"Content: {clause.get('clause_content', '')}\n"
+            f"Jurisdiction: {jurisdiction}\n"
+            f"Keywords: {keywords}"
+        )
+
+        metadata = {
+            "document_type": document_type,
+            "clause_title": clause_title,
+            "jurisdiction": jurisdiction,
+            "clause_id": clause.get("id", ""),
+            "keywords": keywords
+        }
+
+        return Document(page_content=content, metadata=metadata)
+
     def create_vector_store(self):
         """Create and populate vector store with legal clauses"""
+        if self.embeddings is None:
+            self._ensure_ready()
         try:
             # Load clauses
             clauses = self.load_legal_clauses()
@@ -160,44 +358,31 @@ class RAGPipeline:
                 clauses = self.get_default_clauses()
             
             # Prepare documents for embedding
-            documents = []
-            for clause in clauses:
-                # Combine relevant information for embedding
-                content = f"""
-                Document Type: {clause.get('document_type', 'general')}
-                Clause Title: {clause.get('clause_title', '')}
-                Content: {clause.get('clause_content', '')}
-                Jurisdiction: {clause.get('jurisdiction', 'general')}
-                Keywords: {', '.join(clause.get('keywords', []))}
-                """
-                
-                metadata = {
-                    "document_type": clause.get("document_type", "general"),
-                    "clause_title": clause.get("clause_title", ""),
-                    "jurisdiction": clause.get("jurisdiction", "general"),
-                    "clause_id": clause.get("id", ""),
-                    "keywords": ", ".join(clause.get("keywords", []))
-                }
-                
-                documents.append(Document(
-                    page_content=content.strip(),
-                    metadata=metadata
-                ))
-            
-            # Split documents into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            
-            split_docs = text_splitter.split_documents(documents)
+            documents = [self._build_document(clause) for clause in clauses]
+
+            # Split documents into chunks. Most clauses fit a single chunk,
+            # so only documents that actually exceed the chunk size go
+            # through the splitter's regex/scan machinery
+            split_docs = [doc for doc in documents if len(doc.page_content) <= 500]
+            long_docs = [doc for doc in documents if len(doc.page_content) > 500]
+            if long_docs:
+                text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=500,
+                    chunk_overlap=50,
+                    length_function=len,
+                    separators=["\n\n", "\n", " ", ""]
+                )
+                split_docs.extend(text_splitter.split_documents(long_docs))
             logger.info(f"Split {len(documents)} documents into {len(split_docs)} chunks")
             
-            # Create vector store
-            self.vector_store = FAISS.from_documents(split_docs, self.embeddings)
-            
+            # Embed every chunk in one explicit batched forward pass, then
+            # build the index from the precomputed vectors - avoids any
+            # per-document encoder calls inside from_documents
+            texts = [doc.page_content for doc in split_docs]
+            metadatas = [doc.metadata for doc in split_docs]
+            vectors = self.embeddings.embed_documents(texts)
+            self.vector_store = self._build_faiss_store(texts, vectors, metadatas)
+
             # Save vector store
             os.makedirs(os.path.dirname(Config.VECTOR_STORE_PATH), exist_ok=True)
             self.vector_store.save_local(Config.VECTOR_STORE_PATH)
@@ -207,7 +392,46 @@ class RAGPipeline:
             logger.error(f"Failed to create vector store: {str(e)}")
             raise
     
-    def retrieve_relevant_clauses(self, query: str, document_type: str = None, 
+    def _build_faiss_store(self, texts, vectors, metadatas):
+        """Build the FAISS store with an index suited to the corpus size
+
+        Small corpora keep the exact flat index. Past _IVFPQ_MIN_VECTORS
+        the store switches to an IVF + product-quantization index: PQ
+        compresses each fp32 vector ~32x and IVF restricts each search to
+        a few partitions, so lookups stop scanning the full table.
+        """
+        if len(texts) < _IVFPQ_MIN_VECTORS:
+            return FAISS.from_embeddings(
+                list(zip(texts, vectors)), self.embeddings, metadatas=metadatas
+            )
+
+        import faiss
+        import numpy as np
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+
+        matrix = np.asarray(vectors, dtype="float32")
+        count, dim = matrix.shape
+        nlist = max(8, int(count ** 0.5))
+        # PQ subquantizer count must divide the embedding dimension
+        m = next(m for m in (16, 8, 4, 2, 1) if dim % m == 0)
+
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, m, 8)
+        index.train(matrix)
+        index.add(matrix)
+        index.nprobe = 4
+
+        docstore = InMemoryDocstore({
+            str(i): Document(page_content=text, metadata=metadata)
+            for i, (text, metadata) in enumerate(zip(texts, metadatas))
+        })
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id={i: str(i) for i in range(count)}
+        )
+
+    def retrieve_relevant_clauses(self, query: str, document_type: str = None,
                                  jurisdiction: str = "IN", k: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve relevant legal clauses based on query
@@ -221,66 +445,98 @@ class RAGPipeline:
         Returns:
             List of relevant clauses with metadata
         """
+        self._ensure_ready()
         try:
             if not self.vector_store:
                 logger.warning("Vector store not available - running in offline mode")
                 # Return some default/sample clauses for offline mode
                 return self._get_default_clauses(document_type)
-            
-            # Enhance query with context
-            enhanced_query = f"""
-            Legal document generation query:
-            {query}
-            Document Type: {document_type or 'Not specified'}
-            Jurisdiction: {jurisdiction}
-            """
-            
-            # Perform similarity search
-            docs = self.vector_store.similarity_search(enhanced_query, k=k)
-            
-            # Process results
-            results = []
-            for doc in docs:
-                result = {
+
+            # Identical queries skip the embedding + search entirely
+            cache_key = blake2b(
+                f"{query}\x00{document_type}\x00{jurisdiction}\x00{k}".encode(),
+                digest_size=16
+            ).hexdigest()
+            cached = self._retrieval_cache.get(cache_key)
+            if cached is not None:
+                self._retrieval_cache.move_to_end(cache_key)
+                logger.info("Clause retrieval cache hit")
+                return cached
+
+            # Enhance query with context - single flat f-string, no
+            # triple-quoted indentation to trim afterwards
+            enhanced_query = (
+                f"Legal document generation query:\n{query}\n"
+                f"Document Type: {document_type or 'Not specified'}\n"
+                f"Jurisdiction: {jurisdiction}"
+            )
+
+            # Perform similarity search. Over-fetch so the metadata filter
+            # (applied during the search itself) can still yield k results
+            # instead of silently returning fewer
+            docs = self.vector_store.similarity_search_by_vector(
+                self._embed_query_cached(enhanced_query),
+                k=k * 3,
+                filter=lambda md: (
+                    (not document_type or md.get("document_type") == document_type)
+                    and (not jurisdiction or md.get("jurisdiction") in (jurisdiction, "general"))
+                )
+            )
+
+            results = [
+                {
                     "content": doc.page_content,
                     "metadata": doc.metadata,
                     "score": 1.0  # FAISS doesn't return scores by default
                 }
-                
-                # Apply filters if specified
-                if document_type and doc.metadata.get("document_type") != document_type:
-                    continue
-                if jurisdiction and doc.metadata.get("jurisdiction") not in [jurisdiction, "general"]:
-                    continue
-                
-                results.append(result)
-            
+                for doc in docs[:k]
+            ]
+
+            self._retrieval_cache[cache_key] = results
+            if len(self._retrieval_cache) > _RETRIEVAL_CACHE_SIZE:
+                self._retrieval_cache.popitem(last=False)
+
             logger.info(f"Retrieved {len(results)} relevant clauses for query: {query[:50]}...")
             return results
-            
+
         except Exception as e:
             logger.error(f"Error retrieving clauses: {str(e)}")
             return []
-    
+
+    async def aretrieve_relevant_clauses(self, query: str, document_type: str = None,
+                                         jurisdiction: str = "IN", k: int = 5) -> List[Dict[str, Any]]:
+        """Async wrapper around retrieve_relevant_clauses
+
+        The similarity search is blocking (embedding + FAISS); running it in
+        a worker thread keeps the event loop free for other requests.
+        """
+        return await asyncio.to_thread(
+            self.retrieve_relevant_clauses, query, document_type, jurisdiction, k
+        )
+
     def format_clauses_for_prompt(self, clauses: List[Dict[str, Any]]) -> str:
         """Format retrieved clauses for inclusion in LLM prompt"""
         if not clauses:
             return "No relevant clauses found in database."
         
-        formatted = "RELEVANT LEGAL CLAUSES FROM DATABASE:\n\n"
-        
+        # Accumulate parts and join once - repeated += on a growing string
+        # is O(N^2) in total copies
+        parts = ["RELEVANT LEGAL CLAUSES FROM DATABASE:\n"]
+
         for i, clause in enumerate(clauses, 1):
             metadata = clause.get("metadata", {})
             content = clause.get("content", "")
-            
-            formatted += f"CLAUSE {i}:\n"
-            formatted += f"Title: {metadata.get('clause_title', 'N/A')}\n"
-            formatted += f"Document Type: {metadata.get('document_type', 'N/A')}\n"
-            formatted += f"Jurisdiction: {metadata.get('jurisdiction', 'N/A')}\n"
-            formatted += f"Content:\n{content}\n"
-            formatted += "-" * 50 + "\n\n"
-        
-        return formatted
+
+            parts.append(
+                f"CLAUSE {i}:\n"
+                f"Title: {metadata.get('clause_title', 'N/A')}\n"
+                f"Document Type: {metadata.get('document_type', 'N/A')}\n"
+                f"Jurisdiction: {metadata.get('jurisdiction', 'N/A')}\n"
+                f"Content:\n{content}\n"
+                f"{_CLAUSE_SEPARATOR}\n"
+            )
+
+        return "\n".join(parts) + "\n"
     
     def add_clause_to_database(self, clause_data: Dict[str, Any]):
         """Add a new clause to the database"""
@@ -302,20 +558,29 @@ class RAGPipeline:
             # Load existing file content if exists
             existing_clauses = []
             if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    existing_clauses = json.load(f)
-            
+                with open(filepath, 'rb') as f:
+                    existing_clauses = orjson.loads(f.read())
+
             # Add new clause
             existing_clauses.append(clause_data)
-            
-            # Save file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(existing_clauses, f, indent=2, ensure_ascii=False)
+
+            # Save file - orjson keeps the same indented UTF-8 format as
+            # the old json.dump call
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(existing_clauses, option=orjson.OPT_INDENT_2))
             
             logger.info(f"Added new clause to {filename}")
-            
-            # Recreate vector store to include new clause
-            self.create_vector_store()
+
+            # Cached retrievals may now be stale
+            self._retrieval_cache.clear()
+
+            # Index just the new clause - one embedding forward pass
+            # instead of re-embedding the entire database
+            if self.vector_store:
+                self.vector_store.add_documents([self._build_document(clause_data)])
+                self._schedule_flush()
+            else:
+                self.create_vector_store()
             
             return True
             
@@ -1,133 +1,253 @@
 # main_working.py - Working version with actual document generation
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from typing import List
+
 from api.schemas import DocumentRequest, DocumentResponse
-import uuid
-import json
+import asyncio
+import secrets
 import os
 import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
+from hashlib import blake2b
+
+import orjson
 from document_generation.docx_builder import DocxBuilder
+from utils.document_store import DocumentStore
+
+# Generated files live for an hour; the sweeper reclaims disk and cache
+# entries so sustained traffic can't exhaust the temp directory
+_DOC_TTL_SECONDS = 3600
+_SWEEP_INTERVAL_SECONDS = 60
+
+async def _sweep_expired_documents():
+    while True:
+        await asyncio.sleep(_SWEEP_INTERVAL_SECONDS)
+        filepaths = await asyncio.to_thread(
+            document_store.prune_older_than, _DOC_TTL_SECONDS
+        )
+        for filepath in filepaths:
+            _doc_bytes_cache.pop(filepath, None)
+            try:
+                os.unlink(filepath)
+            except OSError:
+                pass
 
-app = FastAPI(title="Legal Drafting LLM - Working Version", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Size the loop's default executor explicitly so every to_thread
+    # offload (document builds, saves) shares one right-sized pool
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2))
+    sweeper = asyncio.create_task(_sweep_expired_documents())
+    yield
+    sweeper.cancel()
 
-# CORS middleware
+# orjson serializes responses several times faster than the stdlib
+# json encoder FastAPI defaults to
+app = FastAPI(
+    title="Legal Drafting LLM - Working Version",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# CORS middleware; max_age lets browsers cache preflight results for a
+# day so OPTIONS round-trips don't precede every hot-path request
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
-# Store generated documents in memory for demo
-generated_documents = {}
+# Compress JSON responses; DOCX downloads opt out via Content-Encoding: identity
+# since the zip container is already deflated
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+
+# Document metadata persists in SQLite so it survives restarts, is shared
+# across workers, and doesn't grow process memory per request
+document_store = DocumentStore()
+
+# Rendered-document cache: identical draft requests (UI retries, tests)
+# reuse the file already on disk instead of rebuilding and re-zipping it
+_DOC_CACHE_SIZE = 512
+_doc_cache: OrderedDict = OrderedDict()
+
+# Serialized bytes for recently generated documents, keyed by filepath so
+# aliased document IDs share entries; recent downloads are served straight
+# from RAM while disk remains the source of truth for the long tail
+_BYTES_CACHE_SIZE = 256
+_doc_bytes_cache: OrderedDict = OrderedDict()
+
+def _build_and_persist(request: DocumentRequest, now_str: str, filename: str):
+    """Build, serialize and write a document - the full synchronous path
+
+    Runs inside a worker thread so the lxml construction and zip
+    DEFLATE never execute on the event loop.
+    """
+    builder = DocxBuilder()
+    builder_fn, _ = DOC_BUILDERS.get(request.document_type, _GENERIC_BUILDER)
+    builder = builder_fn(builder, request, now_str)
+    filepath = os.path.join(tempfile.gettempdir(), filename)
+    data = builder.to_bytes()
+    # One buffered write of the whole zip, then an atomic rename so a
+    # concurrent download can never observe a half-written file
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+    return filepath, data
+
+# Both constant payloads are serialized once at import; the handlers
+# return the same bytes with a long-lived cache header on every request
+_STATIC_CACHE_HEADERS = {"Cache-Control": "public, max-age=86400"}
+
+_ROOT_BODY = orjson.dumps({
+    "message": "Legal Drafting LLM API - Working Version",
+    "status": "active",
+    "endpoints": [
+        "/api/v1/document-types",
+        "/api/v1/draft-document",
+        "/api/v1/download/{document_id}"
+    ]
+})
 
 @app.get("/")
 async def root():
-    return {
-        "message": "Legal Drafting LLM API - Working Version",
-        "status": "active",
-        "endpoints": [
-            "/api/v1/document-types",
-            "/api/v1/draft-document",
-            "/api/v1/download/{document_id}"
-        ]
-    }
+    return Response(
+        content=_ROOT_BODY,
+        media_type="application/json",
+        headers=_STATIC_CACHE_HEADERS
+    )
+
+_DOCUMENT_TYPES_BODY = orjson.dumps({
+    "document_types": [
+        {
+            "type_id": "loan_agreement",
+            "name": "Loan Agreement",
+            "description": "Personal and business loan agreements"
+        },
+        {
+            "type_id": "rental_agreement",
+            "name": "Rental Agreement",
+            "description": "Residential and commercial rental agreements"
+        },
+        {
+            "type_id": "service_agreement",
+            "name": "Service Agreement",
+            "description": "Professional service contracts"
+        },
+        {
+            "type_id": "nda",
+            "name": "Non-Disclosure Agreement",
+            "description": "Confidentiality agreements"
+        },
+        {
+            "type_id": "employment_contract",
+            "name": "Employment Contract",
+            "description": "Employee agreements and contracts"
+        }
+    ]
+})
+# Strong validator computed once from the constant payload; clients that
+# revalidate after max-age get a bodyless 304 instead of a re-download
+_DOCUMENT_TYPES_ETAG = '"%s"' % blake2b(_DOCUMENT_TYPES_BODY, digest_size=16).hexdigest()
 
 @app.get("/api/v1/document-types")
-async def get_document_types():
+async def get_document_types(http_request: Request):
     """Get supported document types"""
-    return {
-        "document_types": [
-            {
-                "type_id": "loan_agreement",
-                "name": "Loan Agreement",
-                "description": "Personal and business loan agreements"
-            },
-            {
-                "type_id": "rental_agreement", 
-                "name": "Rental Agreement",
-                "description": "Residential and commercial rental agreements"
-            },
-            {
-                "type_id": "service_agreement",
-                "name": "Service Agreement", 
-                "description": "Professional service contracts"
-            },
-            {
-                "type_id": "nda",
-                "name": "Non-Disclosure Agreement",
-                "description": "Confidentiality agreements"
-            },
-            {
-                "type_id": "employment_contract",
-                "name": "Employment Contract",
-                "description": "Employee agreements and contracts"
-            }
-        ]
-    }
+    if http_request.headers.get("if-none-match") == _DOCUMENT_TYPES_ETAG:
+        return Response(
+            status_code=304,
+            headers={"ETag": _DOCUMENT_TYPES_ETAG, **_STATIC_CACHE_HEADERS}
+        )
+    return Response(
+        content=_DOCUMENT_TYPES_BODY,
+        media_type="application/json",
+        headers={"ETag": _DOCUMENT_TYPES_ETAG, **_STATIC_CACHE_HEADERS}
+    )
 
 @app.post("/api/v1/draft-document", response_model=DocumentResponse)
 async def draft_document(request: DocumentRequest):
-    """Generate a legal document with actual DOCX creation"""
-    
-    # Basic validation
-    if not request.prompt or len(request.prompt.strip()) < 10:
-        raise HTTPException(
-            status_code=400,
-            detail="Prompt must be at least 10 characters long"
-        )
-    
+    """Generate a legal document with actual DOCX creation
+
+    Prompt length is enforced by the schema (min_length=10 with
+    whitespace stripping in pydantic-core), so no handler-level
+    re-validation is needed.
+    """
     # Generate unique document ID
-    document_id = str(uuid.uuid4())[:8]
+    # 64 random bits straight to hex - no intermediate UUID object or
+    # string slice, and collisions stay negligible at any realistic scale
+    document_id = secrets.token_hex(8)
     
     try:
-        # Create DOCX document
-        builder = DocxBuilder()
-        
-        # Get document content based on type
-        if request.document_type == "loan_agreement":
-            builder = create_loan_agreement(builder, request)
-            sections_count = 3
-        elif request.document_type == "rental_agreement":
-            builder = create_rental_agreement(builder, request)
-            sections_count = 3
-        elif request.document_type == "service_agreement":
-            builder = create_service_agreement(builder, request)
-            sections_count = 3
-        elif request.document_type == "nda":
-            builder = create_nda(builder, request)
-            sections_count = 3
-        elif request.document_type == "employment_contract":
-            builder = create_employment_contract(builder, request)
-            sections_count = 3
+        _, sections_count = DOC_BUILDERS.get(request.document_type, _GENERIC_BUILDER)
+        # One clock read per request; the formatted form feeds the
+        # builders and the datetime feeds the response timestamp
+        now = datetime.now()
+        now_str = now.strftime('%B %d, %Y')
+
+        # The date lands in the rendered text, so it is part of the key
+        cache_key = blake2b(orjson.dumps(
+            (request.document_type, request.jurisdiction, request.prompt,
+             request.variables, now_str),
+            option=orjson.OPT_SORT_KEYS
+        )).hexdigest()
+
+        cached = _doc_cache.get(cache_key)
+        if cached is not None and os.path.exists(cached[0]):
+            # Identical request already rendered - alias the existing file
+            _doc_cache.move_to_end(cache_key)
+            filepath, etag = cached
+            filename = os.path.basename(filepath)
         else:
-            builder = create_generic_document(builder, request)
-            sections_count = 3
-        
-        # Save document
-        filename = f"legal_document_{document_id}.docx"
-        filepath = builder.save_to_temp(filename)
-        
-        # Store document info
-        generated_documents[document_id] = {
-            "filepath": filepath,
-            "filename": filename,
-            "document_type": request.document_type,
-            "created_at": datetime.now(),
-            "variables": request.variables
-        }
+            # Build and save off the event loop - element construction
+            # plus zip DEFLATE would otherwise block every other
+            # in-flight request for the whole generation
+            filename = f"legal_document_{document_id}.docx"
+            filepath, data = await asyncio.to_thread(
+                _build_and_persist, request, now_str, filename
+            )
+
+            etag = blake2b(data, digest_size=16).hexdigest()
+
+            _doc_cache[cache_key] = (filepath, etag)
+            if len(_doc_cache) > _DOC_CACHE_SIZE:
+                _doc_cache.popitem(last=False)
+
+            _doc_bytes_cache[filepath] = data
+            if len(_doc_bytes_cache) > _BYTES_CACHE_SIZE:
+                _doc_bytes_cache.popitem(last=False)
+
+        # Store document info; the SQLite write leaves the event loop
+        await asyncio.to_thread(
+            document_store.add,
+            document_id,
+            filepath=filepath,
+            filename=filename,
+            document_type=request.document_type,
+            variables=request.variables,
+            etag=etag
+        )
         
-        return DocumentResponse(
+        # model_construct skips re-validating fields the server itself
+        # produced; the response schema still serializes identically
+        return DocumentResponse.model_construct(
             success=True,
             message="Document generated successfully",
             document_id=document_id,
             filename=filename,
             document_type=request.document_type,
             sections_count=sections_count,
-            generated_at=datetime.now()
+            generated_at=now
         )
         
     except Exception as e:
@@ -136,22 +256,47 @@ async def draft_document(request: DocumentRequest):
             detail=f"Error generating document: {str(e)}"
         )
 
-def create_loan_agreement(builder: DocxBuilder, request: DocumentRequest):
+# Bound concurrent builds in the bulk endpoint so a 100-document batch
+# doesn't spawn 100 worker threads at once
+_BULK_CONCURRENCY = asyncio.Semaphore(os.cpu_count() or 4)
+
+@app.post("/api/v1/draft-documents")
+async def draft_documents(requests: List[DocumentRequest]):
+    """Generate a batch of legal documents in one round-trip
+
+    Amortizes the per-request HTTP and validation overhead for clients
+    drafting many documents; builds run concurrently up to the
+    semaphore limit, with per-item errors reported inline instead of
+    failing the whole batch.
+    """
+    async def _one(request: DocumentRequest):
+        async with _BULK_CONCURRENCY:
+            try:
+                return await draft_document(request)
+            except HTTPException as e:
+                return {"success": False, "message": e.detail}
+
+    return await asyncio.gather(*(_one(r) for r in requests))
+
+def create_loan_agreement(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a compact loan agreement document for single page"""
     builder.add_title("PERSONAL LOAN AGREEMENT")
     
-    # Get variables
-    lender_name = request.variables.get('lender_name', '[LENDER NAME]')
-    borrower_name = request.variables.get('borrower_name', '[BORROWER NAME]')
-    amount = request.variables.get('amount', '[LOAN AMOUNT]')
-    interest_rate = request.variables.get('interest_rate', '[INTEREST RATE]')
-    tenure = request.variables.get('tenure', '[LOAN TENURE]')
-    purpose = request.variables.get('purpose', 'General financial needs')
+    # Get variables - one attribute walk, then plain dict probes
+    variables = request.variables
+    lender_name = variables.get('lender_name', '[LENDER NAME]')
+    borrower_name = variables.get('borrower_name', '[BORROWER NAME]')
+    amount = variables.get('amount', '[LOAN AMOUNT]')
+    interest_rate = variables.get('interest_rate', '[INTEREST RATE]')
+    tenure = variables.get('tenure', '[LOAN TENURE]')
+    purpose = variables.get('purpose', 'General financial needs')
     
     # Proper agreement header
-    builder.add_paragraph(f"This Loan Agreement ('Agreement') is entered into on {datetime.now().strftime('%B %d, %Y')}, between:")
-    builder.add_paragraph(f"LENDER: {lender_name}")
-    builder.add_paragraph(f"BORROWER: {borrower_name}")
+    builder.add_paragraphs_bulk([
+        f"This Loan Agreement ('Agreement') is entered into on {now_str}, between:",
+        f"LENDER: {lender_name}",
+        f"BORROWER: {borrower_name}"
+    ])
     
     # Loan terms in compact format
     builder.add_heading("LOAN TERMS", level=1)
@@ -162,31 +307,38 @@ def create_loan_agreement(builder: DocxBuilder, request: DocumentRequest):
     builder.add_paragraph(f"Repayment in equal monthly installments. Late payment incurs charges. Default makes full amount due immediately. Governed by {request.jurisdiction} law. Both parties acknowledge agreement.")
     
     # Ultra-compact signatures on same line
-    builder.add_paragraph("SIGNATURES: ____________________    ____________________")
-    builder.add_paragraph(f"                    {lender_name} (LENDER)                {borrower_name} (BORROWER)")
+    builder.add_paragraphs_bulk([
+        "SIGNATURES: ____________________    ____________________",
+        f"                    {lender_name} (LENDER)                {borrower_name} (BORROWER)"
+    ])
     
     return builder
 
-def create_rental_agreement(builder: DocxBuilder, request: DocumentRequest):
+def create_rental_agreement(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a compact rental agreement document for single page"""
     builder.add_title("RENTAL AGREEMENT")
     
-    # Get variables
-    landlord_name = request.variables.get('landlord_name', '[LANDLORD NAME]')
-    tenant_name = request.variables.get('tenant_name', '[TENANT NAME]')
-    property_address = request.variables.get('property_address', '[PROPERTY ADDRESS]')
-    rent_amount = request.variables.get('rent_amount', '[MONTHLY RENT]')
-    lease_term = request.variables.get('lease_term', '[LEASE DURATION]')
+    # Get variables - one attribute walk, then plain dict probes
+    variables = request.variables
+    landlord_name = variables.get('landlord_name', '[LANDLORD NAME]')
+    tenant_name = variables.get('tenant_name', '[TENANT NAME]')
+    property_address = variables.get('property_address', '[PROPERTY ADDRESS]')
+    rent_amount = variables.get('rent_amount', '[MONTHLY RENT]')
+    lease_term = variables.get('lease_term', '[LEASE DURATION]')
     
     # Compact format
     builder.add_heading("PARTIES & PROPERTY", level=1)
-    builder.add_paragraph(f"Agreement dated {datetime.now().strftime('%B %d, %Y')} between LANDLORD: {landlord_name} and TENANT: {tenant_name}.")
-    builder.add_paragraph(f"Property: {property_address} | Rent: {rent_amount}/month | Term: {lease_term}")
+    builder.add_paragraphs_bulk([
+        f"Agreement dated {now_str} between LANDLORD: {landlord_name} and TENANT: {tenant_name}.",
+        f"Property: {property_address} | Rent: {rent_amount}/month | Term: {lease_term}"
+    ])
     
     # Compact terms
     builder.add_heading("TERMS & CONDITIONS", level=1)
-    builder.add_paragraph("1. Rent due 1st of each month. 2. Security deposit per regulations. 3. Tenant maintains property condition. 4. Either party terminates with 30-day notice.")
-    builder.add_paragraph(f"Governed by laws of {request.jurisdiction}.")
+    builder.add_paragraphs_bulk([
+        "1. Rent due 1st of each month. 2. Security deposit per regulations. 3. Tenant maintains property condition. 4. Either party terminates with 30-day notice.",
+        f"Governed by laws of {request.jurisdiction}."
+    ])
     
     # Signatures
     builder.add_paragraph("\nSIGNATURES:")
@@ -195,21 +347,24 @@ def create_rental_agreement(builder: DocxBuilder, request: DocumentRequest):
     
     return builder
 
-def create_service_agreement(builder: DocxBuilder, request: DocumentRequest):
+def create_service_agreement(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a compact service agreement document for single page"""
     builder.add_title("SERVICE AGREEMENT")
     
-    # Get variables
-    service_provider = request.variables.get('service_provider', '[SERVICE PROVIDER]')
-    client_name = request.variables.get('client_name', '[CLIENT NAME]')
-    service_description = request.variables.get('service_description', 'Professional services')
-    payment_amount = request.variables.get('payment_amount', '[PAYMENT AMOUNT]')
-    contract_duration = request.variables.get('contract_duration', '[DURATION]')
+    # Get variables - one attribute walk, then plain dict probes
+    variables = request.variables
+    service_provider = variables.get('service_provider', '[SERVICE PROVIDER]')
+    client_name = variables.get('client_name', '[CLIENT NAME]')
+    service_description = variables.get('service_description', 'Professional services')
+    payment_amount = variables.get('payment_amount', '[PAYMENT AMOUNT]')
+    contract_duration = variables.get('contract_duration', '[DURATION]')
     
     # Compact format
     builder.add_heading("PARTIES & SERVICES", level=1)
-    builder.add_paragraph(f"Agreement dated {datetime.now().strftime('%B %d, %Y')} between PROVIDER: {service_provider} and CLIENT: {client_name}.")
-    builder.add_paragraph(f"Services: {service_description} | Payment: {payment_amount} | Duration: {contract_duration}")
+    builder.add_paragraphs_bulk([
+        f"Agreement dated {now_str} between PROVIDER: {service_provider} and CLIENT: {client_name}.",
+        f"Services: {service_description} | Payment: {payment_amount} | Duration: {contract_duration}"
+    ])
     
     # Terms
     builder.add_heading("TERMS & CONDITIONS", level=1)
@@ -222,19 +377,22 @@ def create_service_agreement(builder: DocxBuilder, request: DocumentRequest):
     
     return builder
 
-def create_nda(builder: DocxBuilder, request: DocumentRequest):
+def create_nda(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a compact NDA document for single page"""
     builder.add_title("NON-DISCLOSURE AGREEMENT")
     
-    # Get variables
-    disclosing_party = request.variables.get('disclosing_party', '[DISCLOSING PARTY]')
-    receiving_party = request.variables.get('receiving_party', '[RECEIVING PARTY]')
-    nda_duration = request.variables.get('nda_duration', '2 years')
+    # Get variables - one attribute walk, then plain dict probes
+    variables = request.variables
+    disclosing_party = variables.get('disclosing_party', '[DISCLOSING PARTY]')
+    receiving_party = variables.get('receiving_party', '[RECEIVING PARTY]')
+    nda_duration = variables.get('nda_duration', '2 years')
     
     # Compact format
     builder.add_heading("PARTIES & CONFIDENTIALITY", level=1)
-    builder.add_paragraph(f"Agreement dated {datetime.now().strftime('%B %d, %Y')} between DISCLOSING PARTY: {disclosing_party} and RECEIVING PARTY: {receiving_party}.")
-    builder.add_paragraph(f"Duration: {nda_duration} | All non-public information shared remains strictly confidential.")
+    builder.add_paragraphs_bulk([
+        f"Agreement dated {now_str} between DISCLOSING PARTY: {disclosing_party} and RECEIVING PARTY: {receiving_party}.",
+        f"Duration: {nda_duration} | All non-public information shared remains strictly confidential."
+    ])
     
     # Terms
     builder.add_heading("OBLIGATIONS", level=1)
@@ -247,22 +405,25 @@ def create_nda(builder: DocxBuilder, request: DocumentRequest):
     
     return builder
 
-def create_employment_contract(builder: DocxBuilder, request: DocumentRequest):
+def create_employment_contract(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a compact employment contract document for single page"""
     builder.add_title("EMPLOYMENT CONTRACT")
     
-    # Get variables
-    employer_name = request.variables.get('employer_name', '[EMPLOYER NAME]')
-    employee_name = request.variables.get('employee_name', '[EMPLOYEE NAME]')
-    job_title = request.variables.get('job_title', '[JOB TITLE]')
-    start_date = request.variables.get('start_date', '[START DATE]')
-    salary = request.variables.get('salary', '[ANNUAL SALARY]')
-    working_hours = request.variables.get('working_hours', '40 hrs/week')
+    # Get variables - one attribute walk, then plain dict probes
+    variables = request.variables
+    employer_name = variables.get('employer_name', '[EMPLOYER NAME]')
+    employee_name = variables.get('employee_name', '[EMPLOYEE NAME]')
+    job_title = variables.get('job_title', '[JOB TITLE]')
+    start_date = variables.get('start_date', '[START DATE]')
+    salary = variables.get('salary', '[ANNUAL SALARY]')
+    working_hours = variables.get('working_hours', '40 hrs/week')
     
     # Compact format
     builder.add_heading("EMPLOYMENT DETAILS", level=1)
-    builder.add_paragraph(f"Contract dated {datetime.now().strftime('%B %d, %Y')} between EMPLOYER: {employer_name} and EMPLOYEE: {employee_name}.")
-    builder.add_paragraph(f"Position: {job_title} | Start: {start_date} | Salary: {salary} | Hours: {working_hours}")
+    builder.add_paragraphs_bulk([
+        f"Contract dated {now_str} between EMPLOYER: {employer_name} and EMPLOYEE: {employee_name}.",
+        f"Position: {job_title} | Start: {start_date} | Salary: {salary} | Hours: {working_hours}"
+    ])
     
     # Terms
     builder.add_heading("TERMS & CONDITIONS", level=1)
@@ -275,21 +436,26 @@ def create_employment_contract(builder: DocxBuilder, request: DocumentRequest):
     
     return builder
 
-def create_generic_document(builder: DocxBuilder, request: DocumentRequest):
+def create_generic_document(builder: DocxBuilder, request: DocumentRequest, now_str: str):
     """Create a generic legal document"""
     doc_type_name = request.document_type.replace('_', ' ').title() if request.document_type else 'Legal Document'
     builder.add_title(doc_type_name.upper())
     
     # Introduction
     builder.add_heading("1. INTRODUCTION", level=1)
-    builder.add_paragraph(f"This document was generated based on the following requirements:")
-    builder.add_paragraph(f"'{request.prompt}'")
+    builder.add_paragraphs_bulk([
+        "This document was generated based on the following requirements:",
+        f"'{request.prompt}'"
+    ])
     
     # Variables
-    if request.variables:
+    variables = request.variables
+    if variables:
         builder.add_heading("2. DETAILS", level=1)
-        for key, value in request.variables.items():
-            builder.add_paragraph(f"• {key.replace('_', ' ').title()}: {value}")
+        builder.add_paragraphs_bulk(
+            f"• {key.replace('_', ' ').title()}: {value}"
+            for key, value in variables.items()
+        )
     
     # Governing law
     builder.add_heading("3. GOVERNING LAW", level=1)
@@ -297,32 +463,112 @@ def create_generic_document(builder: DocxBuilder, request: DocumentRequest):
     
     return builder
 
+# Document-type dispatch table; resolved with one dict probe per request.
+# Each entry carries the builder plus the section count it produces, so
+# the response metadata stays next to the function that defines it.
+DOC_BUILDERS = {
+    "loan_agreement": (create_loan_agreement, 4),
+    "rental_agreement": (create_rental_agreement, 3),
+    "service_agreement": (create_service_agreement, 3),
+    "nda": (create_nda, 3),
+    "employment_contract": (create_employment_contract, 3),
+}
+_GENERIC_BUILDER = (create_generic_document, 3)
+
+@app.get("/api/v1/metadata/{document_id}")
+async def get_document_metadata(document_id: str):
+    """Get stored metadata for a generated document
+
+    The download path only needs filepath and filename; the richer
+    fields (created_at, variables) live in SQLite and are served here
+    instead of being held in process memory per document.
+    """
+    doc_info = await asyncio.to_thread(document_store.get, document_id)
+    if doc_info is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found"
+        )
+
+    return {
+        "document_id": doc_info["document_id"],
+        "filename": doc_info["filename"],
+        "document_type": doc_info["document_type"],
+        "created_at": doc_info["created_at"],
+        "variables": doc_info["variables"]
+    }
+
 @app.get("/api/v1/download/{document_id}")
-async def download_document(document_id: str):
+async def download_document(document_id: str, http_request: Request):
     """Download generated document"""
-    if document_id not in generated_documents:
+    doc_info = await asyncio.to_thread(document_store.get, document_id)
+    if doc_info is None:
         raise HTTPException(
             status_code=404,
             detail="Document not found"
         )
-    
-    doc_info = generated_documents[document_id]
+
     filepath = doc_info["filepath"]
     filename = doc_info["filename"]
-    
+    etag = doc_info["etag"]
+
+    # Document bytes are immutable per ID, so a matching ETag means the
+    # client's copy is current and the whole transfer can be skipped
+    if etag is not None:
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        extra_headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    else:
+        extra_headers = {}
+
+    # Recently generated documents are still in RAM - skip the disk read
+    data = _doc_bytes_cache.get(filepath)
+    if data is not None:
+        _doc_bytes_cache.move_to_end(filepath)
+        return Response(
+            content=data,
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Encoding": "identity",
+                **extra_headers
+            }
+        )
+
     if not os.path.exists(filepath):
         raise HTTPException(
             status_code=404,
             detail="Document file not found on server"
         )
-    
+
+    # FileResponse streams the file in 64 KiB chunks from a worker thread,
+    # so large documents never buffer fully in memory or block the loop
+    # filename= sets Content-Disposition itself; a manual copy of the
+    # header would shadow it and can defeat server fast paths
     return FileResponse(
         path=filepath,
         filename=filename,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={
+            # Skip gzip middleware - .docx is already a compressed zip
+            "Content-Encoding": "identity",
+            **extra_headers
+        }
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    # uvloop + httptools are bundled with uvicorn[standard] and are each
+    # worth ~10% throughput over the stdlib loop/parser. Multi-worker is
+    # safe now that document metadata lives in the shared SQLite store;
+    # the import-string form is required for workers > 1.
+    uvicorn.run(
+        "main:app",
+        host="127.0.0.1",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+        log_level="warning",
+        access_log=False,
+    )
\ No newline at end of file
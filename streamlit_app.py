@@ -4,9 +4,11 @@ Legal Drafting LLM - Streamlit Web Application
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import json
 import tempfile
 import os
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any
 from streamlit_components import (
@@ -18,58 +20,104 @@ from streamlit_components import (
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+
+# Fragments rerun only their own body on interaction instead of the
+# whole script; fall back to plain functions on Streamlit < 1.37
+_fragment = getattr(st, "fragment", lambda f: f)
 DOCUMENT_TYPES = {
     "loan_agreement": "Loan Agreement",
-    "rental_agreement": "Rental Agreement", 
+    "rental_agreement": "Rental Agreement",
     "service_agreement": "Service Agreement",
     "nda": "Non-Disclosure Agreement"
 }
+# Stable option tuple for the selectbox - built once, not per rerun
+_DOC_TYPE_KEYS = tuple(DOCUMENT_TYPES)
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Shared requests.Session with a keep-alive connection pool
+
+    One pooled session per server process means the API calls reuse
+    established TCP connections instead of paying a handshake each
+    time; cache_resource is the Streamlit home for such singletons.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 def init_session_state():
     """Initialize session state variables"""
-    if 'generated_documents' not in st.session_state:
-        st.session_state.generated_documents = []
-    if 'current_document' not in st.session_state:
-        st.session_state.current_document = None
+    # A capped deque keeps long sessions from growing history unbounded
+    st.session_state.setdefault('generated_documents', deque(maxlen=50))
+    st.session_state.setdefault('current_document', None)
 
+# Streamlit reruns the whole script on every widget interaction; the
+# TTL caches keep these probes from costing an HTTP round-trip per rerun
+@st.cache_data(ttl=10, show_spinner=False)
 def check_api_connection():
     """Check if API server is running"""
     try:
-        response = requests.get(f"{API_BASE_URL}/", timeout=5)
+        response = get_http_session().get(f"{API_BASE_URL}/", timeout=(3.05, 5))
         return response.status_code == 200
     except:
         return False
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_document_types():
     """Fetch document types from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/v1/document-types")
+        response = get_http_session().get(
+            f"{API_BASE_URL}/api/v1/document-types", timeout=(3.05, 10)
+        )
         if response.status_code == 200:
             return response.json()
         return None
     except:
         return None
 
+# Keyed on the canonical JSON payload so an identical resubmission hits
+# the cache instead of re-running generation; failures raise and are
+# therefore never cached
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _generate_document_cached(payload_json: str):
+    response = get_http_session().post(
+        f"{API_BASE_URL}/api/v1/draft-document",
+        json=json.loads(payload_json),
+        timeout=(3.05, 60)
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"API returned {response.status_code}")
+    return response.json()
+
 def generate_document(document_data: Dict[str, Any]):
     """Generate document via API"""
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/draft-document",
-            json=document_data,
-            timeout=60
-        )
-        return response.json() if response.status_code == 200 else None
+        return _generate_document_cached(json.dumps(document_data, sort_keys=True))
     except Exception as e:
         st.error(f"Error generating document: {str(e)}")
         return None
 
+# Repeated clicks on the same document are common because every widget
+# change reruns the script; the cache turns them into dict lookups
+@st.cache_data(ttl=1800, max_entries=32, show_spinner=False)
+def _download_document_cached(document_id: str) -> bytes:
+    response = get_http_session().get(
+        f"{API_BASE_URL}/api/v1/download/{document_id}", timeout=(3.05, 30)
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"API returned {response.status_code}")
+    return response.content
+
 def download_document(document_id: str):
     """Download generated document"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/v1/download/{document_id}")
-        if response.status_code == 200:
-            return response.content
-        return None
+        return _download_document_cached(document_id)
     except:
         return None
 
@@ -102,8 +150,8 @@ def render_document_form():
     # Document type selection
     doc_type = st.selectbox(
         "Document Type *",
-        options=list(DOCUMENT_TYPES.keys()),
-        format_func=lambda x: DOCUMENT_TYPES[x],
+        options=_DOC_TYPE_KEYS,
+        format_func=DOCUMENT_TYPES.__getitem__,
         help="Select the type of legal document you want to generate"
     )
     
@@ -201,33 +249,41 @@ def render_document_form():
             return
             
         with st.spinner("Generating your legal document... This may take a few moments."):
-            # Create the prompt with all the information for proper legal document format
+            # Create the prompt with all the information for proper legal
+            # document format - fragments joined once instead of repeated
+            # += reallocation per line
             if doc_type == "loan_agreement":
-                prompt = f"Generate a Personal Loan Agreement with proper legal formatting.\n\n"
-                prompt += f"The agreement should start with: 'This Loan Agreement (\"Agreement\") is entered into on {effective_date}, between:'\n"
-                prompt += f"LENDER: {lender if lender else 'Lender'}\n"
-                prompt += f"BORROWER: {borrower if borrower else 'Borrower'}\n\n"
-                
+                parts = [
+                    "Generate a Personal Loan Agreement with proper legal formatting.\n\n"
+                    f"The agreement should start with: 'This Loan Agreement (\"Agreement\") is entered into on {effective_date}, between:'\n"
+                    f"LENDER: {lender if lender else 'Lender'}\n"
+                    f"BORROWER: {borrower if borrower else 'Borrower'}\n\n"
+                ]
                 if principal_amount and interest_rate and loan_tenure:
-                    prompt += f"Loan Details:\n"
-                    prompt += f"- Principal Amount: {principal_amount:,.2f}\n"
-                    prompt += f"- Interest Rate: {interest_rate}% per annum\n"
-                    prompt += f"- Loan Tenure: {int(loan_tenure)} months\n"
+                    parts.append(
+                        "Loan Details:\n"
+                        f"- Principal Amount: {principal_amount:,.2f}\n"
+                        f"- Interest Rate: {interest_rate}% per annum\n"
+                        f"- Loan Tenure: {int(loan_tenure)} months\n"
+                    )
                     if loan_purpose:
-                        prompt += f"- Purpose: {loan_purpose}\n"
-                
-                prompt += f"\nJurisdiction: {jurisdiction}\n"
+                        parts.append(f"- Purpose: {loan_purpose}\n")
+
+                parts.append(f"\nJurisdiction: {jurisdiction}\n")
                 if special_terms:
-                    prompt += f"Special Terms: {special_terms}\n"
-                
-                prompt += f"\nAdditional Requirements: {description}"
+                    parts.append(f"Special Terms: {special_terms}\n")
+
+                parts.append(f"\nAdditional Requirements: {description}")
+                prompt = "".join(parts)
             else:
-                prompt = f"{description}\n\n"
-                prompt += f"Document Type: {DOCUMENT_TYPES[doc_type]}\n"
-                prompt += f"Jurisdiction: {jurisdiction}\n"
-                prompt += f"Borrower: {borrower if borrower else 'Borrower'}\n"
-                prompt += f"Lender: {lender if lender else 'Lender'}\n"
-                prompt += f"Effective Date: {effective_date}\n"
+                prompt = (
+                    f"{description}\n\n"
+                    f"Document Type: {DOCUMENT_TYPES[doc_type]}\n"
+                    f"Jurisdiction: {jurisdiction}\n"
+                    f"Borrower: {borrower if borrower else 'Borrower'}\n"
+                    f"Lender: {lender if lender else 'Lender'}\n"
+                    f"Effective Date: {effective_date}\n"
+                )
                 if special_terms:
                     prompt += f"Special Terms: {special_terms}\n"
             
@@ -265,13 +321,16 @@ def render_document_form():
                 st.session_state.generated_documents.append({
                     "title": f"{DOCUMENT_TYPES[doc_type]} - {effective_date}",
                     "type": doc_type,
-                    "generated_at": str(datetime.now()),
+                    # Second precision up front - the history view shows
+                    # this verbatim, with no per-row slicing on rerun
+                    "generated_at": datetime.now().isoformat(timespec="seconds"),
                     "document_id": result.get('document_id', ''),
                     "status": "Completed"
                 })
             else:
                 st.error("❌ Failed to generate document. Please try again.")
 
+@_fragment
 def render_document_preview():
     """Render document preview and download"""
     if st.session_state.current_document:
@@ -294,31 +353,54 @@ def render_document_preview():
             with st.expander("View Document Content", expanded=True):
                 st.markdown(doc['content'])
         
-        # Download button
+        # Single-stage download: the bytes come from the rerun cache, so
+        # one click saves the file instead of the old fetch-then-save pair
         if 'document_id' in doc:
-            if st.button("📥 Download Document (.docx)", type="primary"):
-                content = download_document(doc['document_id'])
-                if content:
-                    st.download_button(
-                        label="💾 Save Document",
-                        data=content,
-                        file_name=f"{doc.get('document_id', 'document')}.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-                else:
-                    st.error("Failed to download document")
+            content = download_document(doc['document_id'])
+            if content:
+                st.download_button(
+                    label="📥 Download Document (.docx)",
+                    data=content,
+                    file_name=f"{doc.get('document_id', 'document')}.docx",
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    type="primary"
+                )
+            else:
+                st.error("Failed to download document")
+
+@_fragment
+def render_session_history():
+    """Render documents generated in this session"""
+    if not st.session_state.generated_documents:
+        return
+
+    st.subheader("📋 Current Session Documents")
+    # Only the newest entries render per rerun
+    recent = list(st.session_state.generated_documents)[-10:][::-1]
+    type_name = DOCUMENT_TYPES.get
+    for i, doc in enumerate(recent):
+        with st.expander(f"📄 {doc['title']}"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.write(f"**Type:** {type_name(doc['type'], doc['type'])}")
+            with col2:
+                st.write(f"**Generated:** {doc['generated_at']}")
+            with col3:
+                st.write(f"**Status:** {doc['status']}")
 
 def main():
     """Main application"""
-    st.set_page_config(
-        page_title="Legal Drafting LLM",
-        page_icon="🏛️",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    # Initialize session state
-    init_session_state()
+    # Page config and state defaults only need to run on the session's
+    # first pass; later reruns skip straight to rendering
+    if not st.session_state.get("_bootstrapped"):
+        st.set_page_config(
+            page_title="Legal Drafting LLM",
+            page_icon="🏛️",
+            layout="wide",
+            initial_sidebar_state="expanded"
+        )
+        init_session_state()
+        st.session_state["_bootstrapped"] = True
     
     # Render sidebar and get selected page
     page = render_sidebar()
@@ -338,19 +420,7 @@ def main():
     
     elif page == "History":
         render_document_history()
-        
-        # Show recent documents from session
-        if st.session_state.generated_documents:
-            st.subheader("📋 Current Session Documents")
-            for i, doc in enumerate(reversed(st.session_state.generated_documents)):
-                with st.expander(f"📄 {doc['title']}"):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"**Type:** {DOCUMENT_TYPES.get(doc['type'], doc['type'])}")
-                    with col2:
-                        st.write(f"**Generated:** {doc['generated_at'][:19]}")
-                    with col3:
-                        st.write(f"**Status:** {doc['status']}")
+        render_session_history()
     
     elif page == "Help":
         render_help_section()
@@ -3,10 +3,6 @@ Advanced Streamlit Components for Legal Drafting LLM
 """
 
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import pandas as pd
 
 def render_document_templates():
     """Render document templates section"""
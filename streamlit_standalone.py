@@ -5,26 +5,21 @@ No external API needed - everything runs in Streamlit Cloud
 
 import streamlit as st
 import json
+from collections import deque
 import tempfile
 import os
 from datetime import datetime
 from typing import Dict, Any
 
-# Mock LLM for demonstration (replace with actual implementation)
-class MockLLMHandler:
-    """Mock LLM handler for demo purposes"""
-    
-    def generate_document(self, prompt: str, doc_type: str = "loan_agreement") -> Dict[str, Any]:
-        """Generate a mock document based on prompt"""
-        
-        # Simple template-based generation
-        templates = {
-            "loan_agreement": {
-                "title": "LOAN AGREEMENT",
-                "content": f"""
+# Static document skeletons built once at import; only the date and the
+# user's prompt are interpolated per generation
+_TEMPLATES = {
+    "loan_agreement": {
+        "title": "LOAN AGREEMENT",
+        "content": """
 LOAN AGREEMENT
 
-This Loan Agreement is made on {datetime.now().strftime('%d/%m/%Y')} between:
+This Loan Agreement is made on {date} between:
 
 LENDER: [Please fill in lender details]
 BORROWER: [Please fill in borrower details]
@@ -47,14 +42,14 @@ SIGNATURES:
 Lender: ________________    Date: _______
 Borrower: ________________  Date: _______
                 """,
-                "sections": ["parties", "loan_details", "terms", "signatures"]
-            },
-            "rental_agreement": {
-                "title": "RENTAL AGREEMENT", 
-                "content": f"""
+        "sections": ["parties", "loan_details", "terms", "signatures"]
+    },
+    "rental_agreement": {
+        "title": "RENTAL AGREEMENT",
+        "content": """
 RENTAL AGREEMENT
 
-This Rental Agreement is made on {datetime.now().strftime('%d/%m/%Y')} between:
+This Rental Agreement is made on {date} between:
 
 LANDLORD: [Please fill in landlord details]
 TENANT: [Please fill in tenant details]
@@ -77,27 +72,37 @@ SIGNATURES:
 Landlord: ________________  Date: _______
 Tenant: ________________    Date: _______
                 """,
-                "sections": ["parties", "property_details", "terms", "signatures"]
-            }
-        }
-        
-        template = templates.get(doc_type, templates["loan_agreement"])
-        
+        "sections": ["parties", "property_details", "terms", "signatures"]
+    }
+}
+
+# Mock LLM for demonstration (replace with actual implementation)
+class MockLLMHandler:
+    """Mock LLM handler for demo purposes"""
+
+    def generate_document(self, prompt: str, doc_type: str = "loan_agreement") -> Dict[str, Any]:
+        """Generate a mock document based on prompt"""
+        template = _TEMPLATES.get(doc_type, _TEMPLATES["loan_agreement"])
+        now = datetime.now()
+
         return {
             "title": template["title"],
-            "content": template["content"],
+            "content": template["content"].format(
+                date=now.strftime('%d/%m/%Y'), prompt=prompt
+            ),
             "sections": template["sections"],
             "document_type": doc_type,
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": now.isoformat(),
             "metadata": {
                 "generator": "Streamlit Demo",
                 "version": "1.0"
             }
         }
 
-# Initialize session state
+# Initialize session state; the deque caps history so a long session
+# can't grow memory without bound
 if 'generated_documents' not in st.session_state:
-    st.session_state.generated_documents = []
+    st.session_state.generated_documents = deque(maxlen=50)
 
 if 'llm_handler' not in st.session_state:
     st.session_state.llm_handler = MockLLMHandler()
@@ -162,13 +167,20 @@ with col1:
                     # Generate document
                     document = st.session_state.llm_handler.generate_document(prompt, doc_type)
                     
-                    # Add to history
+                    # Add to history; the preview is truncated once here
+                    # instead of per row on every rerun
                     document['id'] = len(st.session_state.generated_documents) + 1
+                    content = document['content']
+                    document['preview'] = (
+                        content[:500] + "..." if len(content) > 500 else content
+                    )
                     st.session_state.generated_documents.append(document)
                     
+                    # No explicit rerun needed: the preview column and
+                    # history render later in this same pass and already
+                    # see the appended document
                     st.success("✅ Document generated successfully!")
-                    st.rerun()
-                    
+
                 except Exception as e:
                     st.error(f"❌ Error generating document: {str(e)}")
         else:
@@ -227,9 +239,12 @@ with col2:
 if st.session_state.generated_documents:
     st.header("📚 Document History")
     
-    for i, doc in enumerate(reversed(st.session_state.generated_documents)):
+    # Render only the most recent entries; older documents stay in the
+    # deque but don't cost widget construction on every rerun
+    recent = list(st.session_state.generated_documents)[-10:][::-1]
+    for i, doc in enumerate(recent):
         with st.expander(f"📄 {doc['title']} (Generated: {doc['generated_at'][:16]})"):
-            st.text_area(f"Content {i+1}:", doc['content'][:500] + "...", height=100, disabled=True)
+            st.text_area(f"Content {i+1}:", doc['preview'], height=100, disabled=True)
             
             col1, col2 = st.columns(2)
             with col1:
@@ -0,0 +1,18 @@
+"""
+Shared test fixtures
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole session
+
+    Using the context manager runs the app lifespan (executor setup,
+    sweeper task) exactly once instead of skipping it per module-level
+    client, and keeps a single portal alive across every test.
+    """
+    with TestClient(app) as c:
+        yield c
@@ -2,16 +2,13 @@
 Tests for API endpoints
 """
 import pytest
-from fastapi.testclient import TestClient
 import json
 import tempfile
 import os
 
 from main import app
 
-client = TestClient(app)
-
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/")
     assert response.status_code == 200
@@ -19,7 +16,7 @@ def test_health_check():
     assert data["status"] == "healthy"
     assert "Legal Drafting LLM" in data["service"]
 
-def test_document_types():
+def test_document_types(client):
     """Test document types endpoint"""
     response = client.get("/api/v1/document-types")
     assert response.status_code == 200
@@ -27,14 +24,12 @@ def test_document_types():
     assert isinstance(data, list)
     assert len(data) > 0
     
-    # Check structure of document types
-    for doc_type in data:
-        assert "type_id" in doc_type
-        assert "name" in doc_type
-        assert "description" in doc_type
-        assert "required_fields" in doc_type
+    # Check structure of document types with one set-subset comparison
+    # per entry instead of four membership asserts
+    required = {"type_id", "name", "description", "required_fields"}
+    assert all(required <= doc_type.keys() for doc_type in data)
 
-def test_draft_document_valid():
+def test_draft_document_valid(client):
     """Test valid document generation request"""
     request_data = {
         "prompt": "Draft a simple rental agreement between John Doe (Landlord) and Jane Smith (Tenant) for an apartment in Mumbai, rent ₹20,000 per month.",
@@ -57,7 +52,7 @@ def test_draft_document_valid():
     assert "filename" in data
     assert "download_url" in data
 
-def test_draft_document_invalid_prompt():
+def test_draft_document_invalid_prompt(client):
     """Test document generation with invalid prompt"""
     request_data = {
         "prompt": "short",  # Too short
@@ -68,7 +63,7 @@ def test_draft_document_invalid_prompt():
     # Depending on validation, this might return 400 or 500
     assert response.status_code in [400, 500]
 
-def test_validate_prompt():
+def test_validate_prompt(client):
     """Test prompt validation endpoint"""
     test_prompt = "I need a loan agreement for ₹1,00,000"
     
@@ -84,7 +79,7 @@ def test_validate_prompt():
     else:
         assert "suggestions" in data
 
-def test_download_endpoint():
+def test_download_endpoint(client):
     """Test document download endpoint"""
     # First generate a document
     request_data = {
@@ -115,24 +110,32 @@ def test_download_endpoint():
 async def test_concurrent_requests():
     """Test handling of concurrent requests"""
     import asyncio
-    
-    async def make_request():
-        request_data = {
-            "prompt": f"Concurrent test document {id}",
-            "document_type": "loan_agreement"
-        }
-        response = client.post("/api/v1/draft-document", json=request_data)
-        return response.status_code
-    
-    # Make multiple concurrent requests
-    tasks = [make_request() for _ in range(3)]
-    results = await asyncio.gather(*tasks)
-    
+    import httpx
+
+    # TestClient.post is synchronous, so gathering it serializes the
+    # calls; ASGITransport drives the app truly concurrently, with a
+    # semaphore bounding in-flight requests
+    semaphore = asyncio.Semaphore(16)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        async def make_request(i):
+            request_data = {
+                "prompt": f"Concurrent test document number {i}",
+                "document_type": "loan_agreement"
+            }
+            async with semaphore:
+                response = await ac.post("/api/v1/draft-document", json=request_data)
+            return response.status_code
+
+        results = await asyncio.gather(*(make_request(i) for i in range(8)))
+
     # All should succeed (or at least not crash)
     for status_code in results:
         assert status_code in [200, 400, 500]  # Acceptable status codes
 
-def test_error_handling():
+def test_error_handling(client):
     """Test error handling for malformed requests"""
     # Test with malformed JSON
     response = client.post("/api/v1/draft-document", data="not json")
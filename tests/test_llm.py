@@ -72,16 +72,18 @@ def test_rag_pipeline_initialization():
 def test_vector_store_creation(mock_faiss):
     """Test vector store creation"""
     mock_vector_store = Mock()
-    mock_faiss.from_documents.return_value = mock_vector_store
-    
+    mock_faiss.from_embeddings.return_value = mock_vector_store
+
     pipeline = RAGPipeline()
     pipeline.embeddings = Mock()
-    
+    pipeline.embeddings.embed_documents.return_value = []
+
     with patch.object(pipeline, 'load_legal_clauses', return_value=[]):
         with patch.object(pipeline, 'get_default_clauses', return_value=[]):
             pipeline.create_vector_store()
-            
-            mock_faiss.from_documents.assert_called_once()
+
+            pipeline.embeddings.embed_documents.assert_called_once()
+            mock_faiss.from_embeddings.assert_called_once()
             mock_vector_store.save_local.assert_called_once()
 
 def test_clause_retrieval():
@@ -0,0 +1,118 @@
+"""
+SQLite-backed metadata store for generated documents
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    document_id TEXT PRIMARY KEY,
+    filepath TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    document_type TEXT,
+    created_at TEXT NOT NULL,
+    variables TEXT NOT NULL,
+    etag TEXT
+)
+"""
+
+class DocumentStore:
+    """Metadata store for generated documents
+
+    Replaces the in-process dict that grew without bound, vanished on
+    restart and diverged between uvicorn workers. WAL journaling keeps
+    concurrent readers unblocked while a writer commits.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(
+            tempfile.gettempdir(), "legal_docs_metadata.db"
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        # Databases created before the etag column existed get it added
+        try:
+            self._conn.execute("ALTER TABLE documents ADD COLUMN etag TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.commit()
+
+    def add(self, document_id: str, filepath: str, filename: str,
+            document_type: Optional[str], variables: Optional[Dict[str, Any]] = None,
+            etag: Optional[str] = None):
+        """Record a generated document"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    document_id,
+                    filepath,
+                    filename,
+                    document_type,
+                    datetime.now().isoformat(),
+                    orjson.dumps(variables or {}).decode(),
+                    etag
+                )
+            )
+            self._conn.commit()
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a document's metadata, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document_id, filepath, filename, document_type, created_at,"
+                " variables, etag"
+                " FROM documents WHERE document_id = ?",
+                (document_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "document_id": row[0],
+            "filepath": row[1],
+            "filename": row[2],
+            "document_type": row[3],
+            "created_at": row[4],
+            "variables": orjson.loads(row[5]),
+            "etag": row[6]
+        }
+
+    def prune_older_than(self, max_age_seconds: float) -> List[str]:
+        """Delete records past the TTL and return orphaned filepaths
+
+        Callers own removing the files themselves. The render cache can
+        alias several document_ids to one file, so only filepaths with
+        no surviving row are returned - deleting a shared file while a
+        newer row still references it would 404 a live document.
+        ISO-8601 created_at strings compare correctly as text, so the
+        cutoff is one indexed range scan.
+        """
+        cutoff = (datetime.now() - timedelta(seconds=max_age_seconds)).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT filepath FROM documents"
+                " WHERE created_at < ?"
+                " AND filepath NOT IN ("
+                "SELECT filepath FROM documents WHERE created_at >= ?"
+                ")",
+                (cutoff, cutoff)
+            ).fetchall()
+            cur = self._conn.execute(
+                "DELETE FROM documents WHERE created_at < ?", (cutoff,)
+            )
+            if cur.rowcount:
+                self._conn.commit()
+        return [row[0] for row in rows]
+
+    def __contains__(self, document_id: str) -> bool:
+        return self.get(document_id) is not None
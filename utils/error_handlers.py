@@ -53,8 +53,11 @@ def handle_document_generation_error(error: DocumentGenerationError) -> Dict[str
 
 def handle_general_error(error: Exception) -> Dict[str, Any]:
     """Handle general unexpected errors"""
-    logger.exception(f"Unexpected error: {str(error)}")
-    
+    # Skip traceback capture entirely when ERROR records are filtered
+    # out; under an error storm the formatting otherwise dominates
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(f"Unexpected error: {str(error)}", exc_info=error)
+
     return {
         "error": True,
         "code": "UNKNOWN_001",
@@ -86,13 +89,25 @@ class ErrorHandler:
         Returns:
             Tuple of (status_code, response_dict)
         """
-        for error_type, handler in cls.ERROR_MAPPINGS.items():
-            if isinstance(error, error_type):
+        # Walk the exception's MRO so dispatch is a couple of dict
+        # lookups; the most specific mapped class wins, matching what
+        # the old isinstance scan did only by careful dict ordering
+        for klass in type(error).__mro__:
+            handler = cls.ERROR_MAPPINGS.get(klass)
+            if handler is not None:
                 return handler(error)
-        
+
         # Default handler
         return 500, handle_general_error(error)
 
+# Hoisted so each request pays one hash probe instead of rebuilding a
+# list and scanning it; the error-message join is likewise constant
+_VALID_TYPES = frozenset({
+    "loan_agreement", "rental_agreement", "service_agreement",
+    "nda", "employment_contract", "partnership_deed", "affidavit", "other"
+})
+_VALID_TYPES_MSG = ", ".join(sorted(_VALID_TYPES))
+
 def validate_document_request(prompt: str, doc_type: Optional[str] = None) -> Optional[ValidationError]:
     """
     Validate document generation request
@@ -117,16 +132,10 @@ def validate_document_request(prompt: str, doc_type: Optional[str] = None) -> Op
         )
     
     # Validate document type if provided
-    if doc_type:
-        valid_types = [
-            "loan_agreement", "rental_agreement", "service_agreement",
-            "nda", "employment_contract", "partnership_deed", "affidavit", "other"
-        ]
-        
-        if doc_type not in valid_types:
-            return ValidationError(
-                f"Invalid document type. Must be one of: {', '.join(valid_types)}",
-                {"valid_types": valid_types, "provided_type": doc_type}
-            )
-    
+    if doc_type and doc_type not in _VALID_TYPES:
+        return ValidationError(
+            f"Invalid document type. Must be one of: {_VALID_TYPES_MSG}",
+            {"valid_types": sorted(_VALID_TYPES), "provided_type": doc_type}
+        )
+
     return None
\ No newline at end of file
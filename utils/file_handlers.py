@@ -1,10 +1,13 @@
 """
 File handling utilities for document management
 """
+import asyncio
 import os
 import tempfile
 import shutil
 import logging
+import time
+from operator import itemgetter
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -22,10 +25,12 @@ def cleanup_temp_file(filepath: str):
 
 def generate_filename(document_type: str, extension: str = "docx") -> str:
     """Generate a filename for a document"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
+    # time.strftime formats in C without a datetime allocation, and
+    # .hex skips the hyphenated-UUID string build str() would do
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    unique_id = uuid.uuid4().hex[:8]
     safe_type = document_type.replace(" ", "_").lower()
-    
+
     return f"{safe_type}_{timestamp}_{unique_id}.{extension}"
 
 def ensure_directory(directory: str):
@@ -59,53 +64,67 @@ def read_document(filepath: str) -> Optional[bytes]:
         logger.error(f"Failed to read document {filepath}: {str(e)}")
         return None
 
-def list_documents(directory: str = "generated_documents", 
+async def save_document_async(content: bytes, filename: str,
+                              directory: str = "generated_documents") -> str:
+    """Async wrapper around save_document for use inside request handlers
+
+    The blocking write runs in a worker thread so the event loop keeps
+    serving other requests during disk I/O.
+    """
+    return await asyncio.to_thread(save_document, content, filename, directory)
+
+async def read_document_async(filepath: str) -> Optional[bytes]:
+    """Async wrapper around read_document; see save_document_async"""
+    return await asyncio.to_thread(read_document, filepath)
+
+def list_documents(directory: str = "generated_documents",
                   document_type: Optional[str] = None) -> list:
     """List documents in directory, optionally filtered by type"""
-    if not os.path.exists(directory):
-        return []
-    
+    # os.scandir yields cached stat results from the directory read, so
+    # each entry costs one syscall instead of a listdir + stat pair
     files = []
-    for filename in os.listdir(directory):
-        if document_type and not filename.startswith(document_type):
-            continue
-        
-        if filename.endswith('.docx'):
-            filepath = os.path.join(directory, filename)
-            stats = os.stat(filepath)
-            
-            files.append({
-                "filename": filename,
-                "path": filepath,
-                "size": stats.st_size,
-                "created": datetime.fromtimestamp(stats.st_ctime),
-                "modified": datetime.fromtimestamp(stats.st_mtime)
-            })
-    
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                filename = entry.name
+                if document_type and not filename.startswith(document_type):
+                    continue
+
+                if filename.endswith('.docx') and entry.is_file():
+                    stats = entry.stat()
+                    files.append({
+                        "filename": filename,
+                        "path": entry.path,
+                        "size": stats.st_size,
+                        "created": datetime.fromtimestamp(stats.st_ctime),
+                        "modified": datetime.fromtimestamp(stats.st_mtime)
+                    })
+    except FileNotFoundError:
+        return []
+
     # Sort by creation time (newest first)
-    files.sort(key=lambda x: x["created"], reverse=True)
+    files.sort(key=itemgetter("created"), reverse=True)
     return files
 
 def cleanup_old_files(directory: str, max_age_hours: int = 24):
     """Clean up files older than specified hours"""
-    if not os.path.exists(directory):
+    # Pure float math against st_mtime; no datetime objects in the loop
+    cutoff = time.time() - max_age_hours * 3600
+
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
         return
-    
-    current_time = datetime.now()
-    
-    for filename in os.listdir(directory):
-        filepath = os.path.join(directory, filename)
-        
-        try:
-            if os.path.isfile(filepath):
-                file_age = current_time - datetime.fromtimestamp(os.path.getmtime(filepath))
-                
-                if file_age.total_seconds() > (max_age_hours * 3600):
-                    os.remove(filepath)
-                    logger.info(f"Cleaned up old file: {filepath}")
-                    
-        except Exception as e:
-            logger.warning(f"Failed to cleanup file {filepath}: {str(e)}")
+
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    logger.info(f"Cleaned up old file: {entry.path}")
+
+            except Exception as e:
+                logger.warning(f"Failed to cleanup file {entry.path}: {str(e)}")
 
 def get_file_info(filepath: str) -> Optional[dict]:
     """Get information about a file"""
@@ -129,25 +148,30 @@ def get_file_info(filepath: str) -> Optional[dict]:
         logger.error(f"Failed to get file info for {filepath}: {str(e)}")
         return None
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def _format_size(size_bytes: int) -> str:
     """Format file size in human-readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
+    # bit_length picks the unit in one integer op instead of dividing
+    # through the units; same output as the old loop
+    if size_bytes <= 0:
+        return "0.0 B"
+    idx = min((size_bytes.bit_length() - 1) // 10, 4)
+    return f"{size_bytes / (1 << (10 * idx)):.1f} {_SIZE_UNITS[idx]}"
+
+# Extension lookup table built once; one dict probe per call instead of
+# walking an if/elif chain with list memberships
+_EXT_TO_TYPE = {
+    '.docx': 'document',
+    '.pdf': 'pdf',
+    '.txt': 'text',
+    '.md': 'text',
+    '.json': 'data',
+    '.xml': 'data',
+    '.yaml': 'data',
+    '.yml': 'data',
+}
 
 def _get_file_type(filepath: str) -> str:
     """Get file type based on extension"""
-    ext = os.path.splitext(filepath)[1].lower()
-    
-    if ext == '.docx':
-        return 'document'
-    elif ext == '.pdf':
-        return 'pdf'
-    elif ext in ['.txt', '.md']:
-        return 'text'
-    elif ext in ['.json', '.xml', '.yaml', '.yml']:
-        return 'data'
-    else:
-        return 'other'
\ No newline at end of file
+    return _EXT_TO_TYPE.get(os.path.splitext(filepath)[1].lower(), 'other')
\ No newline at end of file